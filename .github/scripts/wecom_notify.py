@@ -6,12 +6,60 @@ WeCom (企业微信) webhook 简单推送脚本
   python .github/scripts/wecom_notify.py "<webhook_url>" "<text_message>"
 或从环境变量读：
   WECHAT_WEBHOOK, MSG
+发送失败只打印错误（errcode / 回包），默认不导致整个 Job 失败；
+设置 WECOM_STRICT=1 时发送失败以退出码 1 结束。
 """
 
+import http.client
 import json
 import os
 import sys
-import urllib.request
+from urllib.parse import urlsplit
+
+# 按 (scheme, host, port) 复用连接：同一进程内多次 send 只做一次 TCP/TLS 握手
+_CONNS = {}
+
+
+def _get_conn(scheme, host, port):
+    key = (scheme, host, port)
+    conn = _CONNS.get(key)
+    if conn is None:
+        cls = http.client.HTTPConnection if scheme == "http" else http.client.HTTPSConnection
+        conn = cls(host, port, timeout=10)
+        _CONNS[key] = conn
+    return conn
+
+
+def send(hook, msg):
+    """发送一条文本消息；企业微信确认送达（errcode=0）返回 True，否则打印回包返回 False"""
+    u = urlsplit(hook)
+    path = u.path + ("?" + u.query if u.query else "")
+    payload = {"msgtype": "text", "text": {"content": msg}}
+    # ensure_ascii=False：中文按 UTF-8 原样发送，比 \uXXXX 转义小约 3 倍
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    key = (u.scheme, u.hostname, u.port)
+    try:
+        conn = _get_conn(*key)
+        conn.request("POST", path, body=data, headers={"Content-Type": "application/json"})
+        r = conn.getresponse()
+        body = r.read()  # 必须读完才能复用连接
+    except Exception as e:
+        # 连接已坏：丢掉，下次 send 重新建连
+        conn = _CONNS.pop(key, None)
+        if conn is not None:
+            conn.close()
+        print("WeCom error:", e)
+        return False
+
+    # key 无效 / 限频 / 内容超长等失败也是 HTTP 200，只能看 errcode；
+    # 成功回包固定以 {"errcode":0 开头，只有失败才解码打印
+    if r.status == 200 and b'"errcode":0' in body[:64]:
+        print("WeCom OK")
+        return True
+    print("WeCom error:", r.status, body[:200].decode("utf-8", errors="ignore"))
+    return False
+
 
 def main():
     hook = None
@@ -33,22 +81,9 @@ def main():
     if not msg:
         msg = "(empty message)"
 
-    payload = {"msgtype": "text", "text": {"content": msg}}
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        hook,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=10) as r:
-            body = r.read().decode("utf-8", errors="ignore")
-            print("WeCom OK:", body[:200])
-    except Exception as e:
-        print("WeCom error:", e)
-        # 不导致整个 Job 失败
-        # 如要失败请改为：sys.exit(1)
+    if not send(hook.strip(), msg) and os.environ.get("WECOM_STRICT") == "1":
+        # 通知失败默认不导致整个 Job 失败；显式开启 WECOM_STRICT 才让这一步失败
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,4 @@
 import os
-import sys
-import traceback
 from datetime import datetime
 import time
 
@@ -32,15 +30,12 @@ def okx_bar(interval: str) -> str:
 from .trader import OKXTrader, load_config
 from .strategy import generate_signal
 
-# 根目录的企业微信推送：兼容多种函数名，如果都没有就退化成打印
+# 企业微信推送：导入失败（如缺依赖）就退化成打印
 try:
-    from wecom_notify import send_text as send_wecom_text
+    from .wecom_notify import send_text as send_wecom_text
 except ImportError:
-    try:
-        from wecom_notify import send_markdown as send_wecom_text
-    except ImportError:
-        def send_wecom_text(msg: str) -> None:
-            print(f"[WECOM MOCK] {msg}")
+    def send_wecom_text(msg: str) -> None:
+        print(f"[WECOM MOCK] {msg}")
 
 
 def symbol_to_inst_id(symbol: str) -> str:
@@ -76,19 +71,28 @@ def _format_signal_extra(info: dict) -> str:
     return "\n".join(lines)
 
 
-def run_once(cfg: dict) -> None:
-    env = os.getenv("BOT_ENV", "test").lower()
-    use_demo = env != "live"
-    print(f"[ENV] BOT_ENV={env}, use_demo={use_demo}")
+def run_once(cfg: dict, trader: OKXTrader | None = None) -> None:
+    """
+    扫一轮信号。trader 不传就自己建一个、跑完关掉；
+    daemon 传进来自己的 trader，线程池 / 连接整轮复用，不在这里关。
+    """
+    if trader is None:
+        env = os.getenv("BOT_ENV", "test").lower()
+        use_demo = env != "live"
+        print(f"[ENV] BOT_ENV={env}, use_demo={use_demo}")
+        with OKXTrader(cfg, use_demo=use_demo) as trader:
+            _run_once(cfg, trader)
+    else:
+        _run_once(cfg, trader)
 
+
+def _run_once(cfg: dict, trader: OKXTrader) -> None:
     interval = cfg.get("interval", "1h")
     bar = okx_bar(interval)
     htf_bar = okx_bar(cfg.get("htf_bar", "4h"))
 
     print(f"Running bot once, interval={interval}, bar={bar}, htf_bar={htf_bar}")
 
-    trader = OKXTrader(cfg, use_demo=use_demo)
-
     risk_conf = cfg.get("risk", {})
     max_pos_pct = float(risk_conf.get("max_pos", 0.005))
 
@@ -96,8 +100,17 @@ def run_once(cfg: dict) -> None:
     for symbol in symbols:
         inst_id = symbol_to_inst_id(symbol)
 
+        # 最新价先拉，成功后 持仓 / K线 / 大周期K线 再并发发出（见 trader.prefetch_market）
+        futs = trader.prefetch_market(
+            inst_id,
+            bar=bar,
+            limit=int(cfg.get("limit", 200)),
+            htf_bar=htf_bar,
+            htf_limit=int(cfg.get("htf_limit", 200)),
+        )
+
         try:
-            last = trader.get_last_price(inst_id)
+            last = futs["last"].result()
         except Exception as e:
             print(f"[ERROR] get_last_price failed for {symbol}: {e}")
             continue
@@ -105,22 +118,22 @@ def run_once(cfg: dict) -> None:
         # ---------- 2.1 风控检查：已有持仓先看要不要平 ----------
         # （这部分你原来就有，后面我们会在 trader.py 里把 TP/SL 托管和 5s 风控补齐）
         try:
-            positions = trader.get_positions(inst_id)
+            positions = futs["positions"].result()
         except Exception as e:
             print(f"[ERROR][RISK] get_positions failed for {symbol}: {e}")
             positions = []
 
         # ---------- 2.2 拉 K 线 ----------
         try:
-            klines = trader.get_candles(inst_id, bar=bar, limit=int(cfg.get("limit", 200)))
+            klines = futs["klines"].result()
         except Exception as e:
             print(f"[ERROR] get_candles failed for {symbol}: {e}")
             continue
 
         htf_klines = None
         try:
-            if htf_bar:
-                htf_klines = trader.get_candles(inst_id, bar=htf_bar, limit=int(cfg.get("htf_limit", 200)))
+            if "htf_klines" in futs:
+                htf_klines = futs["htf_klines"].result()
         except Exception as e:
             print(f"[WARN] get htf candles failed for {symbol}: {e}")
 
@@ -201,41 +214,38 @@ def run_daemon(cfg: dict) -> None:
     last_pos: dict[str, float] = {}
     last_entry_ts = 0.0
 
-    while True:
-        now = time.time()
-
-        # 1) risk_loop：仓位变化轮询
-        try:
-            positions = trader.get_positions()
-            cur: dict[str, float] = {}
-            for p in positions:
-                inst = p.get("instId")
-                pos = float(p.get("pos") or 0)
-                if inst:
-                    cur[inst] = pos
-
-            # 检测：从有仓位到无仓位（后面 trader.py 会细分成 MANUAL/TP/SL）
-            for inst, prev_pos in list(last_pos.items()):
-                if prev_pos and (cur.get(inst, 0.0) == 0.0):
-                    send_wecom_text(
-                        f"【检测到平仓】{inst} 仓位从 {prev_pos} → 0（可能：手动平仓/交易所止盈止损触发）"
-                    )
-
-            last_pos = cur
-        except Exception as e:
-            print(f"[WARN] risk_loop error: {e}")
+    try:
+        while True:
+            now = time.time()
 
-        # 2) entry_loop：低频扫描信号
-        if now - last_entry_ts >= entry_interval_sec:
+            # 1) risk_loop：仓位变化轮询
             try:
-                print(f"[DAEMON] entry tick @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                run_once(cfg)  # 复用现有逻辑（不破坏你原本的运行方式）
-            except Exception as e:
-                print(f"[ERROR] entry_loop failed: {e}")
-            finally:
-                last_entry_ts = now
+                cur = trader.sync_positions()
 
-        time.sleep(risk_loop_interval)
+                # 检测：从有仓位到无仓位（后面 trader.py 会细分成 MANUAL/TP/SL）
+                for inst, prev_pos in list(last_pos.items()):
+                    if prev_pos and (cur.get(inst, 0.0) == 0.0):
+                        send_wecom_text(
+                            f"【检测到平仓】{inst} 仓位从 {prev_pos} → 0（可能：手动平仓/交易所止盈止损触发）"
+                        )
+
+                last_pos = cur
+            except Exception as e:
+                print(f"[WARN] risk_loop error: {e}")
+
+            # 2) entry_loop：低频扫描信号
+            if now - last_entry_ts >= entry_interval_sec:
+                try:
+                    print(f"[DAEMON] entry tick @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    run_once(cfg, trader)  # 复用现有逻辑，trader / 线程池整个 daemon 期间只建一次
+                except Exception as e:
+                    print(f"[ERROR] entry_loop failed: {e}")
+                finally:
+                    last_entry_ts = now
+
+            time.sleep(risk_loop_interval)
+    finally:
+        trader.close()
 
 
 def main() -> None:
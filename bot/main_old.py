@@ -2,9 +2,19 @@
 import os
 import time
 import json
+import hmac
+import hashlib
 import traceback
+from functools import lru_cache
+from urllib.parse import urlencode
+
+try:
+    import orjson  # 可选：比标准库 json 解码快数倍
+except ImportError:
+    import json as orjson
 import requests
-from requests import RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bot.wecom_notify import wecom_notify, wrap_run, warn_451
 from bot.strategy import load_params, route_signal
 
@@ -32,14 +42,31 @@ REST_BASE = "https://testnet.binance.vision" if TESTNET else "https://api.binanc
 
 
 # ===================== 通用请求 =====================
+# 复用连接；瞬时错误（429/5xx）在 adapter 层带退避重试，不必整轮重来。
+# 只重试 GET：下单 POST 在 5xx 时状态未知，自动重发可能重复下单。
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.25,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        )
+    ),
+)
+
+
 def http_get(url, headers=None, timeout=15):
     try:
-        r = requests.get(url, headers=headers, timeout=timeout)
+        r = _SESSION.get(url, headers=headers, timeout=timeout)
         if r.status_code == 451:
             warn_451(url)
             return None
         r.raise_for_status()
-        return r.json()
+        return orjson.loads(r.content)
     except Exception as e:
         wecom_notify(f"⚠️ GET请求失败：{e}\n{url}")
         return None
@@ -47,12 +74,12 @@ def http_get(url, headers=None, timeout=15):
 
 def http_post(url, headers=None, data=None, timeout=15):
     try:
-        r = requests.post(url, headers=headers, data=data, timeout=timeout)
+        r = _SESSION.post(url, headers=headers, data=data, timeout=timeout)
         if r.status_code == 451:
             warn_451(url)
             return None
         r.raise_for_status()
-        return r.json()
+        return orjson.loads(r.content)
     except requests.HTTPError as he:
         try:
             text = he.response.text
@@ -66,16 +93,26 @@ def http_post(url, headers=None, data=None, timeout=15):
 
 
 # ===================== 账户与交易 =====================
+@lru_cache(maxsize=4)
+def _hmac_proto(secret: str):
+    # 密钥填充（ipad/opad）只做一次，签名时 copy() 出已预置状态的 HMAC
+    return hmac.new(secret.encode(), None, hashlib.sha256)
+
+
 def sign_params(params: dict, secret: str) -> str:
-    import hmac, hashlib
-    from urllib.parse import urlencode
     query = urlencode(params, doseq=True)
-    sig = hmac.new(secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+    h = _hmac_proto(secret).copy()
+    h.update(query.encode())
+    sig = h.hexdigest()
     return f"{query}&signature={sig}"
 
 
+# 私有接口头部只依赖 API KEY，进程内固定，构造一次复用（requests 不会修改传入的 headers）
+_PRIVATE_HEADERS = {"X-MBX-APIKEY": BINANCE_KEY}
+
+
 def private_headers():
-    return {"X-MBX-APIKEY": BINANCE_KEY}
+    return _PRIVATE_HEADERS
 
 
 def ts():
@@ -40,7 +40,13 @@ def macd(arr, fast=12, slow=26, signal=9):
 
 
 def _extract_close(klines):
-    return [float(k[4]) for k in klines]
+    """
+    K线收盘价列（OKX: [ts, o, h, l, c, ...]，字段均为字符串）。
+    整表一次转成 ndarray 再切列 astype，避免逐行 float()。
+    """
+    if not klines:
+        return np.empty(0, dtype=float)
+    return np.asarray(klines)[:, 4].astype(np.float64)
 
 
 def generate_signal(
@@ -1,7 +1,12 @@
 import os
+import copy
 import json
+import time
 import csv
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
@@ -13,30 +18,21 @@ from okx.MarketData import MarketAPI
 
 def _wecom_send_text(msg: str) -> None:
     """
-    兼容你项目里不同版本的 wecom_notify.py：
-    - 优先使用 send_text / send_markdown / notify_error
-    - 没有就退化为 print
+    企业微信推送（bot/wecom_notify.py），导入失败（如缺依赖）就退化为 print
     """
     try:
-        from wecom_notify import send_text
+        from bot.wecom_notify import send_text
         send_text(msg)
         return
     except Exception:
         pass
 
-    try:
-        from wecom_notify import send_markdown
-        send_markdown(msg)
-        return
-    except Exception:
-        pass
-
     print("[WECOM MOCK]", msg)
 
 
 def _wecom_notify_error(title: str, detail: str) -> None:
     try:
-        from wecom_notify import notify_error
+        from bot.wecom_notify import notify_error
         notify_error(title, detail)
         return
     except Exception:
@@ -48,9 +44,16 @@ def load_config(path: str = "params.json") -> dict:
     兼容 GitHub Actions / 本地 / 子目录运行：
     1) 优先读取环境变量 BOT_CONFIG（若设置）
     2) 依次尝试：传入 path、仓库根目录 params.json、config/params.json、bot/params.json
+
+    同一 (path, BOT_CONFIG) 只读盘解析一次；返回深拷贝，调用方随便改。
     """
-    # 1) 环境变量强制指定
     env_path = os.getenv("BOT_CONFIG", "").strip()
+    return copy.deepcopy(_load_config_cached(path, env_path))
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(path: str, env_path: str) -> dict:
+    # 1) 环境变量强制指定
     candidates = []
     if env_path:
         candidates.append(Path(env_path))
@@ -83,6 +86,22 @@ def load_config(path: str = "params.json") -> dict:
     )
 
 
+# 开仓单的固定字段只由方向决定，按方向预先生成，下单时只补 instId / sz / lever / TP-SL
+_ORDER_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "LONG": {"tdMode": "cross", "side": "buy", "posSide": "long", "ordType": "market"},
+    "SHORT": {"tdMode": "cross", "side": "sell", "posSide": "short", "ordType": "market"},
+}
+
+
+def _tp_sl_prices(entry_price: float, tp_pct: float, sl_pct: float, is_long: bool) -> Tuple[float, float]:
+    """
+    纯算术：由开仓价和百分比算出 (tp_price, sl_price)。
+    多单 TP 在上、SL 在下；空单相反。格式化留给调用方。
+    """
+    s = 1.0 if is_long else -1.0
+    return entry_price * (1 + s * tp_pct), entry_price * (1 - s * sl_pct)
+
+
 class OKXTrader:
     """
     本文件职责（本轮重点）：
@@ -114,6 +133,8 @@ class OKXTrader:
         self.trade = TradeAPI(api_key, api_secret, passphrase, flag=flag)
         self.account = AccountAPI(api_key, api_secret, passphrase, flag=flag)
         self.market = MarketAPI(flag=flag)
+        self._api_args = (api_key, api_secret, passphrase)
+        self._flag = flag
 
         # trade journal
         self.journal_path = cfg.get("trade_journal_path", "trade_journal.csv")
@@ -122,6 +143,71 @@ class OKXTrader:
         # position snapshot（给 main 的 risk loop 用）
         self.last_positions: Dict[str, float] = {}
 
+        # get_positions 的短 TTL 缓存：{instId|None: (monotonic_ts, data)}
+        self._pos_cache: Dict[Optional[str], Tuple[float, List[dict]]] = {}
+        self._pos_ttl = float(cfg.get("positions_cache_ttl", 1.0))
+
+        # 行情类 GET 彼此独立，用线程池并发发出（见 prefetch_market）。
+        # 池子按需建一次、跟 trader 同生命周期，close() / with 退出时关掉。
+        # python-okx 每个 API 对象本身就是一个 httpx.Client（http2），SDK 没承诺
+        # 多线程共用同一个 client 安全，所以池里每个线程各建一套自己的 client（_tls）。
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tls = threading.local()
+        self._worker_clients: list = []
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def __enter__(self) -> "OKXTrader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        关掉预取线程池和池里各线程自己的 SDK client。幂等，close 后再 prefetch 会重新建池。
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+            clients, self._worker_clients = self._worker_clients, []
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        for c in clients:
+            close = getattr(c, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    def _init_worker(self) -> None:
+        # 线程池 initializer：每个工作线程一套独立的 MarketAPI / AccountAPI
+        market = MarketAPI(flag=self._flag)
+        account = AccountAPI(*self._api_args, flag=self._flag)
+        self._tls.market = market
+        self._tls.account = account
+        with self._lock:
+            self._worker_clients += [market, account]
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=4,
+                    thread_name_prefix="okx-prefetch",
+                    initializer=self._init_worker,
+                )
+            return self._pool
+
+    def _market_api(self):
+        # 池线程用自己的 client，主线程用 self.market
+        return getattr(self._tls, "market", self.market)
+
+    def _account_api(self):
+        return getattr(self._tls, "account", self.account)
+
     # ------------------------------------------------------------------
     # Journal
     # ------------------------------------------------------------------
@@ -189,31 +275,75 @@ class OKXTrader:
     # Market / Candles / Positions
     # ------------------------------------------------------------------
     def get_last_price(self, inst_id: str) -> float:
-        r = self.market.get_ticker(instId=inst_id)
+        r = self._market_api().get_ticker(instId=inst_id)
         return float(r["data"][0]["last"])
 
     def get_candles(self, inst_id: str, bar: str = "15m", limit: int = 200) -> list:
         """
         OKX 行情K线（MarketData）
+        OKX 按时间倒序返回（最新在前），这里翻成正序（最旧在前）再交出去：
+        strategy 里的 EMA / RSI / closes[-1] 都默认正序。
         """
-        r = self.market.get_candlesticks(instId=inst_id, bar=bar, limit=str(limit))
-        return r.get("data", [])
+        r = self._market_api().get_candlesticks(instId=inst_id, bar=bar, limit=str(limit))
+        return r.get("data", [])[::-1]
 
     def get_positions(self, inst_id: Optional[str] = None) -> List[dict]:
-        r = self.account.get_positions(instId=inst_id)
-        return r.get("data", [])
+        """
+        持仓查询带短 TTL 缓存（默认 1s，cfg.positions_cache_ttl 可调），
+        同一轮里重复查询不再打交易所；下单后整体失效。
+        返回的是列表副本，调用方随便改不会污染缓存。
+        """
+        now = time.monotonic()
+        hit = self._pos_cache.get(inst_id)
+        if hit is not None and now - hit[0] < self._pos_ttl:
+            return list(hit[1])
+
+        r = self._account_api().get_positions(instId=inst_id)
+        data = r.get("data", [])
+        self._pos_cache[inst_id] = (now, data)
+        return list(data)
+
+    def prefetch_market(
+        self,
+        inst_id: str,
+        bar: str = "15m",
+        limit: int = 200,
+        htf_bar: Optional[str] = None,
+        htf_limit: int = 200,
+    ) -> Dict[str, Future]:
+        """
+        并发拉单个 symbol 一轮所需的行情（最新价 / 持仓 / K线 / 大周期K线）。
+        最新价先发；它成功了其余几个再一起发出去，失败了就一个都不发，
+        关键路径从 N×RTT 变成约 2×RTT。
+        返回 {name: Future}，调用方自行 .result()，异常在 .result() 时原样抛出
+        （最新价失败时，其余 Future 抛的也是最新价那个异常）。
+        """
+        pool = self._get_pool()
+        last = pool.submit(self.get_last_price, inst_id)
+
+        def after_last(fn, *args):
+            # 池是 FIFO，排到这里时 last 一定已经在跑或跑完，不会互相卡死
+            last.result()
+            return fn(*args)
+
+        futs: Dict[str, Future] = {
+            "last": last,
+            "positions": pool.submit(after_last, self.get_positions, inst_id),
+            "klines": pool.submit(after_last, self.get_candles, inst_id, bar, limit),
+        }
+        if htf_bar:
+            futs["htf_klines"] = pool.submit(after_last, self.get_candles, inst_id, htf_bar, htf_limit)
+        return futs
 
     def sync_positions(self) -> Dict[str, float]:
         """
         返回 {instId: pos}
         """
-        pos_map: Dict[str, float] = {}
-        for p in self.get_positions():
-            inst = p.get("instId")
-            pos = float(p.get("pos") or 0)
-            if inst:
-                pos_map[inst] = pos
-        return pos_map
+        return {
+            p["instId"]: float(p.get("pos") or 0)
+            for p in self.get_positions()
+            if p.get("instId")
+        }
 
     # ------------------------------------------------------------------
     # Order sizing & leverage
@@ -261,16 +391,8 @@ class OKXTrader:
         """
         市价开仓 + OKX 托管 TP/SL（attachAlgoOrds）
         """
-        pos_side = "long" if side == "LONG" else "short"
-        ord_side = "buy" if side == "LONG" else "sell"
-
         # 计算 TP/SL 价格
-        if side == "LONG":
-            tp_price = entry_price * (1 + tp_pct)
-            sl_price = entry_price * (1 - sl_pct)
-        else:
-            tp_price = entry_price * (1 - tp_pct)
-            sl_price = entry_price * (1 + sl_pct)
+        tp_price, sl_price = _tp_sl_prices(entry_price, tp_pct, sl_pct, side == "LONG")
 
         # OKX 常用：tpOrdPx / slOrdPx = -1 表示市价委托
         attach = [
@@ -282,16 +404,17 @@ class OKXTrader:
             }
         ]
 
-        resp = self.trade.place_order(
-            instId=inst_id,
-            tdMode="cross",
-            side=ord_side,
-            ordType="market",
-            sz=str(size),
-            posSide=pos_side,
-            lever=str(leverage),
-            attachAlgoOrds=attach,
-        )
+        try:
+            resp = self.trade.place_order(
+                **_ORDER_TEMPLATES[side],
+                instId=inst_id,
+                sz=str(size),
+                lever=str(leverage),
+                attachAlgoOrds=attach,
+            )
+        finally:
+            # 无论成败（包括超时 / 回包解析异常，单子可能已被受理），持仓都可能已变化，缓存作废
+            self._pos_cache.clear()
 
         if resp.get("code") != "0":
             _wecom_notify_error("TP/SL 托管下单失败", json.dumps(resp, ensure_ascii=False))
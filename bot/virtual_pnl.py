@@ -1,20 +1,36 @@
 # bot/virtual_pnl.py
 from __future__ import annotations
 
-import csv
+import atexit
 import os
+import sys
+import time
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from bot.trader import OrderRequest, PositionSide
-from datetime import datetime
+
+# 交易日志：手写 CSV 行。行尾沿用 csv 模块默认的 \r\n，和已有日志文件保持一致
+_EOL = "\r\n"
+_LOG_HEADER = (
+    "symbol,side,qty,entry_price,exit_price,entry_time,exit_time,pnl,reason_open,reason_close" + _EOL
+)
+# reason 是唯一的自由文本字段：去掉会破坏行/列结构的字符
+_REASON_TABLE = str.maketrans({"\n": " | ", "\r": None, ",": "，", '"': "'"})
+
+# 秒级时间戳缓存：[epoch_second, formatted]，同一秒内的成交复用同一个字符串
+_TS_CACHE = [0, ""]
 
 
 def _now_ts() -> str:
-    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    t = int(time.time())
+    if t != _TS_CACHE[0]:
+        _TS_CACHE[0] = t
+        _TS_CACHE[1] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(t))
+    return _TS_CACHE[1]
 
 
-@dataclass
+@dataclass(slots=True)
 class VirtualPosition:
     """虚拟持仓，用于计算胜率，不依赖交易所持仓。"""
     symbol: str
@@ -25,7 +41,7 @@ class VirtualPosition:
     reason_open: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ClosedTrade:
     """一笔完成的虚拟交易（用于胜率统计）。"""
     symbol: str
@@ -54,24 +70,46 @@ class VirtualPositionManager:
         self.positions: Dict[str, VirtualPosition] = {}
         self.log_path = f"logs/virtual_trades_{env}.csv"
 
+        # 相对路径跟着 cwd 走，不能按 env 记“建过了”；makedirs(exist_ok) 本身就很便宜，每次都调
         os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
-        if not os.path.exists(self.log_path):
-            with open(self.log_path, "w", newline="", encoding="utf8") as f:
-                w = csv.writer(f)
-                w.writerow(
-                    [
-                        "symbol",
-                        "side",
-                        "qty",
-                        "entry_price",
-                        "exit_price",
-                        "entry_time",
-                        "exit_time",
-                        "pnl",
-                        "reason_open",
-                        "reason_close",
-                    ]
-                )
+
+        # 文件句柄常驻，每笔平仓只拼一行字符串，不再反复 open/close
+        self._fh = open(self.log_path, "a", newline="", encoding="utf8", buffering=64 * 1024)
+        # 追加模式打开后位置在文件末尾：为 0 说明是新文件 / 空文件，补表头（无需额外 stat）
+        if self._fh.tell() == 0:
+            self._fh.write(_LOG_HEADER)
+            self._fh.flush()
+
+        # 平仓记录先攒在内存里，满 VPM_FLUSH_EVERY 条再一次性写入
+        self._pending: List[str] = []
+        self._flush_every = int(os.getenv("VPM_FLUSH_EVERY", "32"))
+        atexit.register(self.close)
+
+    def flush(self) -> None:
+        """
+        把缓冲中的平仓记录写入 CSV（本轮 summary 前可手动调用）。
+        close() 之后才记下的行不丢：临时按追加模式重开文件写进去再关上。
+        """
+        if self._fh.closed:
+            if self._pending:
+                with open(self.log_path, "a", newline="", encoding="utf8") as fh:
+                    if fh.tell() == 0:
+                        fh.write(_LOG_HEADER)
+                    fh.write("".join(self._pending))
+                self._pending.clear()
+            return
+        if self._pending:
+            self._fh.write("".join(self._pending))
+            self._pending.clear()
+        self._fh.flush()
+
+    def close(self) -> None:
+        """刷盘并关闭交易日志（进程退出时 atexit 自动调用，重复调用无副作用）。"""
+        self.flush()
+        if not self._fh.closed:
+            self._fh.close()
+        # 手动关闭后撤掉 atexit 钩子，不然实例和文件句柄会被钩子一直引用到进程退出
+        atexit.unregister(self.close)
 
     @staticmethod
     def _calc_pnl(side: PositionSide, entry_price: float, exit_price: float, qty: float) -> float:
@@ -86,22 +124,15 @@ class VirtualPositionManager:
             return (entry_price - exit_price) * qty
 
     def _log_closed_trade(self, trade: ClosedTrade) -> None:
-        with open(self.log_path, "a", newline="", encoding="utf8") as f:
-            w = csv.writer(f)
-            w.writerow(
-                [
-                    trade.symbol,
-                    trade.side.value,
-                    trade.qty,
-                    trade.entry_price,
-                    trade.exit_price,
-                    trade.entry_time,
-                    trade.exit_time,
-                    trade.pnl,
-                    trade.reason_open.replace("\n", " | "),
-                    trade.reason_close.replace("\n", " | "),
-                ]
-            )
+        # 字段类型固定，symbol / 时间不含逗号，reason 已在入口处清洗：直接拼行，不走 csv 模块
+        self._pending.append(
+            f"{trade.symbol},{trade.side.value},{trade.qty},{trade.entry_price},"
+            f"{trade.exit_price},{trade.entry_time},{trade.exit_time},{trade.pnl},"
+            f"{trade.reason_open},{trade.reason_close}{_EOL}"
+        )
+        # 已 close()（atexit 钩子也撤了）就没人再来刷，直接落盘
+        if len(self._pending) >= self._flush_every or self._fh.closed:
+            self.flush()
 
     def on_order_filled(self, req: OrderRequest, fill_price: float) -> Optional[ClosedTrade]:
         """
@@ -115,10 +146,13 @@ class VirtualPositionManager:
         if not req.position_side:
             return None
 
-        symbol = req.symbol
+        # symbol 取值很少：驻留后 dict 查找命中时只比指针，hash 也缓存在字符串上
+        symbol = sys.intern(req.symbol)
         side = req.position_side
         qty = float(req.amount)
         ts = _now_ts()
+        # 原因文本在入口处清洗一次（换行 -> " | "，逗号 -> 全角，双引号 -> 单引号），之后存储 / 写日志都直接用
+        reason = (req.reason or "").translate(_REASON_TABLE)
 
         current = self.positions.get(symbol)
 
@@ -130,7 +164,7 @@ class VirtualPositionManager:
                 qty=qty,
                 entry_price=fill_price,
                 entry_time=ts,
-                reason_open=req.reason or "",
+                reason_open=reason,
             )
             return None
 
@@ -139,9 +173,8 @@ class VirtualPositionManager:
             new_qty = current.qty + qty
             if new_qty <= 0:
                 return None
-            current.entry_price = (
-                current.entry_price * current.qty + fill_price * qty
-            ) / new_qty
+            # 增量均值：避免 price*qty 大数相加后再除带来的精度损失
+            current.entry_price += (fill_price - current.entry_price) * (qty / new_qty)
             current.qty = new_qty
             # entry_time 和 reason_open 保持最早那一笔
             return None
@@ -158,18 +191,15 @@ class VirtualPositionManager:
             exit_time=ts,
             pnl=pnl,
             reason_open=current.reason_open,
-            reason_close=req.reason or "",
+            reason_close=reason,
         )
         self._log_closed_trade(closed)
 
-        # 开新反向仓
-        self.positions[symbol] = VirtualPosition(
-            symbol=symbol,
-            side=side,
-            qty=qty,
-            entry_price=fill_price,
-            entry_time=ts,
-            reason_open=req.reason or "",
-        )
+        # 开新反向仓：旧仓已记入 closed，原地复用这个 VirtualPosition 对象
+        current.side = side
+        current.qty = qty
+        current.entry_price = fill_price
+        current.entry_time = ts
+        current.reason_open = reason
 
         return closed
@@ -0,0 +1,661 @@
+# bot/wecom_notify.py
+"""
+企业微信机器人推送（全仓库唯一实现）。
+
+- 新接口：send / send_text / send_markdown / notify_error / notify_open / notify_close
+- 异步接口：上面各函数的 *_async 版本，asyncio 事件循环里用（可选依赖 httpx）
+- 旧接口（兼容 main_old / trainer / tools）：send_wecom_message / send_wecom_markdown /
+  wecom_notify / warn_451 / wrap_run
+- 根目录 wecom_notify.py 只是 re-export，老的 `from wecom_notify import ...` 照常可用
+"""
+import asyncio
+import atexit
+import hashlib
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+try:
+    import httpx  # 可选：*_async 接口用
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  可选：装了就让 httpx 走 HTTP/2（pip install httpx[http2]）
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        # orjson 直接产出 UTF-8 bytes，中文不转义
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+
+
+__all__ = [
+    "send",
+    "send_text",
+    "send_markdown",
+    "notify_error",
+    "notify_open",
+    "notify_close",
+    "flush",
+    "reload_default_webhook",
+    "set_coalesce_window",
+    "send_async",
+    "send_text_async",
+    "send_markdown_async",
+    "notify_error_async",
+    "notify_open_async",
+    "notify_close_async",
+    "aclose",
+    "send_wecom_message",
+    "send_wecom_markdown",
+    "wecom_notify",
+    "warn_451",
+    "wrap_run",
+]
+
+_JSON_HEADERS = {"Content-Type": "application/json; charset=utf-8"}
+# (连接, 读取) 超时分开：连不上很快放弃；读超时也压短，配合下面的熔断尽快判定故障
+_TIMEOUT = (3, 5)
+
+# 熔断：连续 _BREAKER_FAILS 次发送异常后，_BREAKER_COOLDOWN 秒内直接丢弃消息，
+# 企业微信挂掉时不让每条推送都卡满超时、把后台队列和调用方拖住
+_BREAKER_FAILS = 5
+_BREAKER_COOLDOWN = 30.0
+_breaker_lock = threading.Lock()
+_fail_count = 0
+_open_until = 0.0
+
+# 请求体模板：只有 content 需要 JSON 转义，其余是固定字节，按 msgtype 预先写好
+_PAYLOAD_TPL = {
+    "text": b'{"msgtype":"text","text":{"content":%s}}',
+    "markdown": b'{"msgtype":"markdown","markdown":{"content":%s}}',
+}
+
+
+# 所有推送共用一个 Session：同一 qyapi 主机的 TCP/TLS 连接 keep-alive 复用，
+# 瞬时 429/5xx 在 adapter 层小退避重试（推送重复一条无害）。
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+
+_WEBHOOK_BY_KEY = "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={}"
+
+
+@lru_cache(maxsize=1)
+def _default_webhook() -> str:
+    """
+    默认 webhook，只解析一次环境变量：
+    WECOM_WEBHOOK_KEY（只填 key）> WECOM_WEBHOOK > WECHAT_WEBHOOK（旧名）
+    """
+    key = os.getenv("WECOM_WEBHOOK_KEY", "").strip()
+    if key:
+        return _normalize_url(_WEBHOOK_BY_KEY.format(key))
+    return _normalize_url(os.getenv("WECOM_WEBHOOK") or os.getenv("WECHAT_WEBHOOK") or "")
+
+
+def reload_default_webhook() -> str:
+    """环境变量变了（测试里改 env、运行中 load_dotenv）后调用，重新解析默认 webhook。"""
+    _default_webhook.cache_clear()
+    return _default_webhook()
+
+
+# 调用方传进来的 webhook 只有寥寥几个：规范化结果按原串缓存，之后每次同一个字符串对象
+_NORMALIZED_URLS: Dict[str, str] = {}
+
+
+def _normalize_url(raw: str) -> str:
+    url = _NORMALIZED_URLS.get(raw)
+    if url is None:
+        url = sys.intern(raw.strip())
+        if url and not url.startswith("https://"):
+            print("[WECOM WARN] webhook is not an https:// URL:", url)
+        _NORMALIZED_URLS[raw] = url
+    return url
+
+
+def _get_webhook(webhook: Optional[str] = None) -> str:
+    if webhook:
+        return _normalize_url(webhook)
+    return _default_webhook()
+
+
+def _payload(msgtype: str, content: str) -> bytes:
+    return _PAYLOAD_TPL[msgtype] % _dumps(content)
+
+
+# 企业微信 markdown 单条上限 4096 是 UTF-8 字节数，不是字符数：一个汉字占 3 字节
+_MD_MAX = 4096
+
+
+def _utf8_len(s: str) -> int:
+    return len(s.encode("utf-8"))
+
+
+def _cut_utf8(s: str, max_bytes: int) -> str:
+    """截到不超过 max_bytes 个 UTF-8 字节，不切断多字节字符"""
+    b = s.encode("utf-8")
+    if len(b) <= max_bytes:
+        return s
+    return b[:max_bytes].decode("utf-8", "ignore")
+
+
+def _md_parts(content: str) -> List[str]:
+    """超过 _MD_MAX 字节的 markdown 按行拆成几条发送（单行就超长的再按字节硬切），每条都不超限"""
+    if _utf8_len(content) <= _MD_MAX:
+        return [content]
+    parts: List[str] = []
+    cur: List[str] = []
+    size = 0
+    for line in content.splitlines(keepends=True):
+        n = _utf8_len(line)
+        while n > _MD_MAX:
+            if cur:
+                parts.append("".join(cur))
+                cur, size = [], 0
+            head = _cut_utf8(line, _MD_MAX)
+            parts.append(head)
+            line = line[len(head):]
+            n = _utf8_len(line)
+        if size + n > _MD_MAX:
+            parts.append("".join(cur))
+            cur, size = [], 0
+        cur.append(line)
+        size += n
+    if cur:
+        parts.append("".join(cur))
+    return parts
+
+
+def _check_reply(body: bytes) -> None:
+    # 成功回包固定是 {"errcode":0,"errmsg":"ok"}：只看开头几十字节，失败才解析 JSON 打日志
+    if b'"errcode":0' in body[:64]:
+        return
+    try:
+        print("[WECOM ERROR]", _loads(body))
+    except Exception:
+        print("[WECOM ERROR]", body[:200])
+
+
+def _breaker_is_open(msgtype: str) -> bool:
+    if time.monotonic() < _open_until:
+        print("[WECOM BREAKER OPEN] dropped", msgtype)
+        return True
+    return False
+
+
+def _breaker_record(ok: bool) -> None:
+    global _fail_count, _open_until
+    with _breaker_lock:
+        if ok:
+            _fail_count = 0
+            _open_until = 0.0
+            return
+        _fail_count += 1
+        if _fail_count >= _BREAKER_FAILS:
+            _fail_count = 0
+            _open_until = time.monotonic() + _BREAKER_COOLDOWN
+            print(f"[WECOM WARN] {_BREAKER_FAILS} consecutive failures, pausing for {_BREAKER_COOLDOWN:.0f}s")
+
+
+def _post(msgtype: str, content: str, webhook: Optional[str] = None) -> None:
+    url = _get_webhook(webhook)
+    if not url:
+        print(f"[WECOM MOCK] ({msgtype})", content)
+        return
+
+    for part in (_md_parts(content) if msgtype == "markdown" else (content,)):
+        if _breaker_is_open(msgtype):
+            return
+        try:
+            r = _SESSION.post(url, data=_payload(msgtype, part), headers=_JSON_HEADERS, timeout=_TIMEOUT)
+            r.raise_for_status()
+        except Exception as e:
+            _breaker_record(False)
+            print("[WECOM ERROR]", repr(e))
+            return
+        # 能收到 2xx 回包就说明链路正常，errcode 非 0（key 失效等）不计入熔断
+        _breaker_record(True)
+        _check_reply(r.content)
+
+
+# ---------------------------------------------------------------------------
+# 后台发送：调用方只入队立即返回，单个 daemon 线程负责真正的 HTTPS POST。
+# 同一时间窗内连续到达的 markdown 消息合并成一条发送（合并后不超过 _MD_MAX 字节）；
+# text 消息逐条发送。
+# ---------------------------------------------------------------------------
+_Q: "queue.Queue[Tuple[str, str, Optional[str]]]" = queue.Queue(maxsize=512)
+_COALESCE_WINDOW = 0.1   # 秒：首条消息到达后再等这么久收集同批消息
+_COALESCE_MAX = 8        # 每批最多取出条数
+_COALESCE_SEP = "\n\n---\n\n"
+_COALESCE_SEP_BYTES = _utf8_len(_COALESCE_SEP)
+
+
+def set_coalesce_window(ms: int) -> None:
+    """调整合并等待窗口（毫秒）；0 表示不等待、不合并，延迟敏感的部署用。"""
+    global _COALESCE_WINDOW
+    _COALESCE_WINDOW = max(0, ms) / 1000.0
+
+_worker_lock = threading.Lock()
+_worker_thread: Optional[threading.Thread] = None
+
+
+def _worker() -> None:
+    while True:
+        batch = [_Q.get()]
+        deadline = time.monotonic() + _COALESCE_WINDOW
+        while len(batch) < _COALESCE_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_Q.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            # 相邻、发往同一 webhook 的 markdown 拼成一条（按 UTF-8 字节不超过 _MD_MAX），保持原有顺序
+            groups: List[List[Any]] = []   # [msgtype, webhook, contents, 字节数]
+            for msgtype, content, webhook in batch:
+                last = groups[-1] if groups else None
+                size = _utf8_len(content) if msgtype == "markdown" else 0
+                if (msgtype == "markdown" and last is not None and last[0] == "markdown"
+                        and last[1] == webhook and last[3] + _COALESCE_SEP_BYTES + size <= _MD_MAX):
+                    last[2].append(content)
+                    last[3] += _COALESCE_SEP_BYTES + size
+                else:
+                    groups.append([msgtype, webhook, [content], size])
+            for msgtype, webhook, contents, _ in groups:
+                _post(msgtype, _COALESCE_SEP.join(contents), webhook=webhook)
+        except Exception as e:
+            print("[WECOM ERROR]", repr(e))
+        finally:
+            for _ in batch:
+                _Q.task_done()
+
+
+def _ensure_worker() -> None:
+    global _worker_thread
+    if _worker_thread is not None:
+        return
+    with _worker_lock:
+        if _worker_thread is None:
+            _worker_thread = threading.Thread(target=_worker, name="wecom-notify", daemon=True)
+            _worker_thread.start()
+
+
+def _enqueue(msgtype: str, content: str, webhook: Optional[str] = None) -> None:
+    _ensure_worker()
+    item = (msgtype, content, webhook)
+    try:
+        _Q.put_nowait(item)
+    except queue.Full:
+        # 队列满：丢最旧的一条，保证最新消息能发出去
+        try:
+            _Q.get_nowait()
+            _Q.task_done()
+        except queue.Empty:
+            pass
+        print("[WECOM WARN] queue full, dropped oldest message")
+        try:
+            _Q.put_nowait(item)
+        except queue.Full:
+            print("[WECOM WARN] queue full, dropped", msgtype)
+
+
+def flush(timeout: float = 5.0) -> bool:
+    """
+    等待队列中的消息发送完毕，最多等 timeout 秒。
+    全部发完返回 True；超时返回 False。进程退出时 atexit 自动调用。
+    """
+    deadline = time.monotonic() + timeout
+    with _Q.all_tasks_done:
+        while _Q.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _Q.all_tasks_done.wait(remaining)
+    return True
+
+
+atexit.register(flush)
+
+
+# 去重：同一条消息 _DEDUP_WINDOW 秒内只发一次，之后再发时附上被抑制的次数
+_DEDUP_WINDOW = 30.0
+_DEDUP_MAX = 64
+_recent: "OrderedDict[int, List[float]]" = OrderedDict()   # hash -> [last_sent, suppressed]
+_recent_lock = threading.Lock()
+
+
+# 异常告警单独去重：正文带秒级时间戳，上面按整条内容去重拦不住刷屏的同一异常，
+# 这里按 (标题, detail 摘要, webhook) 判重，窗口更长、容量更大
+_ERR_DEDUP_WINDOW = 60.0
+_ERR_DEDUP_MAX = 256
+_err_recent: "OrderedDict[Tuple[str, bytes, Optional[str]], List[float]]" = OrderedDict()
+
+
+def _check_recent(cache: "OrderedDict", key: Any, window: float, max_size: int) -> Optional[int]:
+    """
+    窗口内重复返回 None（不发送）；否则返回上次发送后被抑制的条数。
+    """
+    now = time.monotonic()
+    with _recent_lock:
+        prev = cache.get(key)
+        if prev is not None and now - prev[0] < window:
+            prev[1] += 1
+            return None
+        suppressed = int(prev[1]) if prev is not None else 0
+        cache[key] = [now, 0]
+        cache.move_to_end(key)
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+    return suppressed
+
+
+def _dedup(msgtype: str, content: str, webhook: Optional[str]) -> Optional[int]:
+    return _check_recent(_recent, hash((msgtype, content, webhook)), _DEDUP_WINDOW, _DEDUP_MAX)
+
+
+def _dedup_error(title: str, detail: str, webhook: Optional[str]) -> Optional[int]:
+    # traceback 可能很长：key 里只存 8 字节 blake2b 摘要
+    digest = hashlib.blake2b(detail.encode("utf-8", "replace"), digest_size=8).digest()
+    return _check_recent(_err_recent, (title, digest, webhook), _ERR_DEDUP_WINDOW, _ERR_DEDUP_MAX)
+
+
+def _dedup_note(suppressed: int) -> str:
+    return f"\n（此前 {_DEDUP_WINDOW:.0f}s 内重复 {suppressed} 次已合并）"
+
+
+def send(content: str, *, msgtype: str = "text", webhook: Optional[str] = None, blocking: bool = False) -> None:
+    """
+    统一入口。msgtype: "text" | "markdown"。
+    blocking=False（默认）：入队后立即返回，由后台线程发送，不占下单路径；
+    blocking=True：不经队列，在调用线程里直接发完再返回（异常告警这类必须送达的消息用）。
+    """
+    suppressed = _dedup(msgtype, content, webhook)
+    if suppressed is None:
+        return
+    if suppressed:
+        content += _dedup_note(suppressed)
+    if blocking:
+        _post(msgtype, content, webhook=webhook)
+    else:
+        _enqueue(msgtype, content, webhook)
+
+
+def send_text(content: str, webhook: Optional[str] = None, blocking: bool = False) -> None:
+    send(content, msgtype="text", webhook=webhook, blocking=blocking)
+
+
+def send_markdown(content: str, webhook: Optional[str] = None, blocking: bool = False) -> None:
+    send(content, msgtype="markdown", webhook=webhook, blocking=blocking)
+
+
+# 开仓 / 平仓 / 异常消息的固定骨架预先写好，每次只用 % 填一个元组
+# 字段都按 %s（即 str()）输出，和原来 f-string 的显示一致；盈亏保留两位小数
+_OPEN_TPL = (
+    "### 🚀 开仓\n"
+    "- 时间：%s\n"
+    "- 标的：**%s**\n"
+    "- 方向：**%s**\n"
+    "- 价格：%s\n"
+    "- 数量：%s\n"
+    "- 杠杆：%sx\n"
+)
+_CLOSE_TPL = (
+    "### %s 平仓\n"
+    "- 时间：%s\n"
+    "- 标的：**%s**\n"
+    "- 方向：**%s**\n"
+    "- 开仓价：%s\n"
+    "- 平仓价：%s\n"
+    "- 盈亏：**%.2f USDT (%.2f%%)**\n"
+    "- 原因：**%s**\n"
+)
+# 不用三引号，避免“未闭合”这种低级事故
+_ERROR_TPL = (
+    "### ❗ 异常告警\n"
+    "- 时间：%s\n"
+    "- 类型：**%s**\n"
+    "%s\n"
+    "```\n"
+    "%s\n"
+    "```\n"
+)
+# 异常 detail 超长时只留头尾（头:尾 = 4:3），保证整条告警不超过企业微信的 _MD_MAX 字节
+_DETAIL_HEAD_RATIO = 4 / 7
+_DETAIL_CUT_TPL = "\n...[truncated {} bytes]...\n"
+_CLOSE_EMOJI = {"TP": "🎯", "SL": "🛑", "MANUAL": "✋", "BOT": "🤖"}
+
+
+def _now_ts() -> str:
+    """本地时间 YYYY-mm-dd HH:MM:SS；直接拼整数字段，不走 strftime 解析格式串"""
+    t = time.localtime()
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+
+
+# 消息正文只在这里拼：同步 / 异步两套接口共用
+def _clip_detail(detail: str, budget: int) -> str:
+    """按 UTF-8 字节把 detail 压到 budget 以内：保留头尾，中间换成截断标记，切口落在字符边界上"""
+    b = detail.encode("utf-8")
+    if len(b) <= budget:
+        return detail
+    keep = max(0, budget - _utf8_len(_DETAIL_CUT_TPL.format(len(b))))
+    head_n = int(keep * _DETAIL_HEAD_RATIO)
+    head = b[:head_n].decode("utf-8", "ignore")
+    tail = b[len(b) - (keep - head_n):].decode("utf-8", "ignore")
+    cut = len(b) - _utf8_len(head) - _utf8_len(tail)
+    return f"{head}{_DETAIL_CUT_TPL.format(cut)}{tail}"
+
+
+def _build_error_md(title: str, detail: str, suppressed: int = 0) -> str:
+    ts = _now_ts()
+    repeat = f"- 此前 {_ERR_DEDUP_WINDOW:.0f}s 内同一异常另有 **{suppressed}** 次未推送\n" if suppressed else ""
+    # detail 的字节预算 = 上限 - 模板/时间/标题/重复提示 - send() 可能追加的去重说明
+    budget = _MD_MAX - _utf8_len(_ERROR_TPL % (ts, title, repeat, "")) - _utf8_len(_dedup_note(10 ** 9))
+    return _ERROR_TPL % (ts, title, repeat, _clip_detail(detail, budget))
+
+
+def _build_open_md(symbol: str, side: str, price: float, size: float, leverage: int,
+                   signal_info: Optional[Dict] = None) -> str:
+    md = _OPEN_TPL % (_now_ts(), symbol, side, price, size, leverage)
+    if not signal_info:
+        return md
+    # 信号条目可能很多：攒成列表一次 join，不做逐条 += 拷贝
+    parts = [md, "\n**信号摘要：**\n"]
+    parts.extend(f"- {k}: {v}\n" for k, v in signal_info.items())
+    return "".join(parts)
+
+
+def _build_close_md(symbol: str, side: str, entry_price: float, exit_price: float, pnl_usdt: float,
+                    pnl_pct: float, reason: str) -> str:
+    return _CLOSE_TPL % (
+        _CLOSE_EMOJI.get(reason, "📦"), _now_ts(), symbol, side, entry_price, exit_price, pnl_usdt, pnl_pct, reason,
+    )
+
+
+# 异常告警默认同步发送（进程可能紧接着退出）；开平仓通知默认入队，不拖慢下单
+# 同一异常 _ERR_DEDUP_WINDOW 秒内只推第一条，窗口过后再出现时附上期间被抑制的次数
+def notify_error(title: str, detail: str, webhook: Optional[str] = None, blocking: bool = True) -> None:
+    suppressed = _dedup_error(title, detail, webhook)
+    if suppressed is None:
+        return
+    send_markdown(_build_error_md(title, detail, suppressed), webhook=webhook, blocking=blocking)
+
+
+def notify_open(symbol: str, side: str, price: float, size: float, leverage: int, signal_info: Optional[Dict] = None,
+                webhook: Optional[str] = None, blocking: bool = False) -> None:
+    send_markdown(_build_open_md(symbol, side, price, size, leverage, signal_info), webhook=webhook, blocking=blocking)
+
+
+def notify_close(symbol: str, side: str, entry_price: float, exit_price: float, pnl_usdt: float, pnl_pct: float,
+                 reason: str, webhook: Optional[str] = None, blocking: bool = False) -> None:
+    send_markdown(_build_close_md(symbol, side, entry_price, exit_price, pnl_usdt, pnl_pct, reason),
+                  webhook=webhook, blocking=blocking)
+
+
+# ---------------------------------------------------------------------------
+# 异步接口：在 asyncio 事件循环里（如异步交易主循环）请用 *_async 版本，
+# 直接 await 一次 POST，不占线程也不经过后台队列。
+# 装了 httpx 用共享的 AsyncClient（再装了 h2 就走 HTTP/2）；没装则把同步 _post 丢到线程里跑。
+# 注意 AsyncClient 绑定创建它的事件循环，换 loop 前先 await aclose()。
+# ---------------------------------------------------------------------------
+_ACLIENT: "Optional[httpx.AsyncClient]" = None
+
+
+async def _aget_client() -> "httpx.AsyncClient":
+    global _ACLIENT
+    if _ACLIENT is None:
+        # HTTP/2：并发推送复用同一条连接多路发送；keep-alive 放长，少做 TLS 握手
+        _ACLIENT = httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(_TIMEOUT[1], connect=_TIMEOUT[0]),
+        )
+    return _ACLIENT
+
+
+async def _apost(msgtype: str, content: str, webhook: Optional[str] = None) -> None:
+    if httpx is None:
+        await asyncio.to_thread(_post, msgtype, content, webhook)
+        return
+
+    url = _get_webhook(webhook)
+    if not url:
+        print(f"[WECOM MOCK] ({msgtype})", content)
+        return
+
+    for part in (_md_parts(content) if msgtype == "markdown" else (content,)):
+        if _breaker_is_open(msgtype):
+            return
+        try:
+            client = await _aget_client()
+            r = await client.post(url, content=_payload(msgtype, part), headers=_JSON_HEADERS)
+            r.raise_for_status()
+        except Exception as e:
+            _breaker_record(False)
+            print("[WECOM ERROR]", repr(e))
+            return
+        _breaker_record(True)
+        _check_reply(r.content)
+
+
+async def aclose() -> None:
+    """关闭异步 client（事件循环结束前调用）。"""
+    global _ACLIENT
+    if _ACLIENT is not None:
+        client, _ACLIENT = _ACLIENT, None
+        await client.aclose()
+
+
+async def send_async(content: str, *, msgtype: str = "text", webhook: Optional[str] = None) -> None:
+    suppressed = _dedup(msgtype, content, webhook)
+    if suppressed is None:
+        return
+    if suppressed:
+        content += _dedup_note(suppressed)
+    await _apost(msgtype, content, webhook)
+
+
+async def send_text_async(content: str, webhook: Optional[str] = None) -> None:
+    await send_async(content, msgtype="text", webhook=webhook)
+
+
+async def send_markdown_async(content: str, webhook: Optional[str] = None) -> None:
+    await send_async(content, msgtype="markdown", webhook=webhook)
+
+
+async def notify_error_async(title: str, detail: str, webhook: Optional[str] = None) -> None:
+    suppressed = _dedup_error(title, detail, webhook)
+    if suppressed is None:
+        return
+    await send_markdown_async(_build_error_md(title, detail, suppressed), webhook=webhook)
+
+
+async def notify_open_async(symbol: str, side: str, price: float, size: float, leverage: int,
+                            signal_info: Optional[Dict] = None, webhook: Optional[str] = None) -> None:
+    await send_markdown_async(_build_open_md(symbol, side, price, size, leverage, signal_info), webhook=webhook)
+
+
+async def notify_close_async(symbol: str, side: str, entry_price: float, exit_price: float, pnl_usdt: float,
+                             pnl_pct: float, reason: str, webhook: Optional[str] = None) -> None:
+    await send_markdown_async(
+        _build_close_md(symbol, side, entry_price, exit_price, pnl_usdt, pnl_pct, reason), webhook=webhook
+    )
+
+
+# ---------------------------------------------------------------------------
+# 旧接口兼容（原 .github/wecom_notify.py、bot/main_old.py、trainer 使用的名字）
+# ---------------------------------------------------------------------------
+def send_wecom_message(text: str) -> None:
+    send(text, msgtype="text")
+
+
+def send_wecom_markdown(text: str) -> None:
+    # 历史行为：markdown 接口实际按纯文本发送
+    send(text, msgtype="text")
+
+
+def wecom_notify(text: str, webhook: Optional[str] = None) -> None:
+    send(text, msgtype="text", webhook=webhook)
+
+
+def warn_451(url: str) -> None:
+    wecom_notify(f"⚠️ 451 地区限制，请求被拒绝：\n{url}")
+
+
+def wrap_run(run_callable: Callable[[], Any]) -> Any:
+    """
+    包一层运行：开始 / 结束 / 异常各推送一条，异常照常抛出。
+    开始通知只入队不等待，和策略本身并行发送；返回前 flush 一次，
+    保证本轮的通知都已送达（最多等 5s）。
+    """
+    run_no = os.getenv("GITHUB_RUN_NUMBER", "local")
+    wecom_notify(f"▶️ Run #{run_no} 开始")
+    try:
+        result = run_callable()
+    except Exception:
+        wecom_notify(f"❌ Run #{run_no} 异常\n{traceback.format_exc()}")
+        raise
+    else:
+        wecom_notify(f"✅ Run #{run_no} 结束")
+        return result
+    finally:
+        flush(timeout=5.0)
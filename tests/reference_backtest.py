@@ -0,0 +1,252 @@
+# tests/reference_backtest.py
+# 对拍用的基准实现：原 tools/train_and_update.py 里 pandas rolling + iterrows 的回测，逐行照抄，不要“优化”它
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+def rsi(series: pd.Series, length: int = 14) -> pd.Series:
+    delta = series.diff()
+    gain = (delta.clip(lower=0)).ewm(alpha=1/length, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1/length, adjust=False).mean()
+    rs = gain / (loss.replace(0, np.nan))
+    return 100 - (100 / (1 + rs))
+
+def metric_sortino(returns: List[float]) -> float:
+    if not returns:
+        return 0.0
+    mean = np.mean(returns)
+    downside = np.std([min(0, r) for r in returns]) or 1e-9
+    return mean / downside
+
+def metric_sharpe(returns: List[float]) -> float:
+    if not returns:
+        return 0.0
+    std = np.std(returns) or 1e-9
+    return np.mean(returns) / std
+
+def max_drawdown(equity: List[float]) -> float:
+    peak = -1e18
+    dd = 0.0
+    for x in equity:
+        if x > peak:
+            peak = x
+        dd = min(dd, (x - peak) / peak if peak > 0 else 0.0)
+    return abs(dd)
+
+def backtest_sma_rsi(
+    df: pd.DataFrame,
+    cash0: float,
+    fee: float,
+    slip: float,
+    sma_fast: int,
+    sma_slow: int,
+    rsi_len: int,
+    rsi_buy_below: float,
+    rsi_sell_above: float,
+    stop_loss_pct: float,
+    take_profit_pct: float,
+) -> Dict[str, float]:
+    d = df.copy()
+    d['sma_fast'] = d['close'].rolling(sma_fast).mean()
+    d['sma_slow'] = d['close'].rolling(sma_slow).mean()
+    d['rsi'] = rsi(d['close'], rsi_len)
+    d = d.dropna().reset_index(drop=True)
+
+    pos = 0.0    # 持仓数量（以“币”为单位）
+    cash = cash0
+    entry_price = 0.0
+    equity_curve = []
+    rets = []
+
+    for i, row in d.iterrows():
+        price = float(row['close'])
+        # 滑点
+        buy_price  = price * (1 + slip)
+        sell_price = price * (1 - slip)
+
+        # 止损 / 止盈
+        if pos > 0:
+            if stop_loss_pct > 0 and (price <= entry_price * (1 - stop_loss_pct)):
+                cash += pos * sell_price * (1 - fee)
+                pos = 0
+            elif take_profit_pct > 0 and (price >= entry_price * (1 + take_profit_pct)):
+                cash += pos * sell_price * (1 - fee)
+                pos = 0
+
+        # 信号
+        up_trend = row['sma_fast'] > row['sma_slow']
+        if pos == 0 and up_trend and row['rsi'] < rsi_buy_below:
+            # 用固定现金买
+            usdt_to_use = min(cash, 1000000)
+            if usdt_to_use > 0:
+                qty = (usdt_to_use / buy_price) * (1 - fee)
+                pos += qty
+                cash -= usdt_to_use
+                entry_price = buy_price
+
+        elif pos > 0 and ((not up_trend) or row['rsi'] > rsi_sell_above):
+            cash += pos * sell_price * (1 - fee)
+            pos = 0
+
+        equity = cash + pos * price
+        equity_curve.append(equity)
+
+        if i > 0:
+            rets.append((equity_curve[-1] - equity_curve[-2]) / max(equity_curve[-2], 1e-9))
+
+    pnl = (equity_curve[-1] - cash0) / cash0 if equity_curve else 0.0
+    dd = max_drawdown(equity_curve) if equity_curve else 0.0
+    sharpe = metric_sharpe(rets)
+    sortino = metric_sortino(rets)
+
+    return dict(pnl=pnl, dd=dd, sharpe=sharpe, sortino=sortino)
+
+def backtest_mean_revert(
+    df: pd.DataFrame,
+    cash0: float,
+    fee: float,
+    slip: float,
+    win_std: int,
+    z_entry: float,
+    z_exit: float,
+    stop_loss_pct: float,
+    take_profit_pct: float,
+) -> Dict[str, float]:
+    d = df.copy()
+    d['ma'] = d['close'].rolling(win_std).mean()
+    d['std'] = d['close'].rolling(win_std).std()
+    d = d.dropna().reset_index(drop=True)
+
+    pos = 0.0
+    cash = cash0
+    entry_price = 0.0
+    equity_curve, rets = [], []
+
+    for i, row in d.iterrows():
+        price = float(row['close'])
+        buy_price  = price * (1 + slip)
+        sell_price = price * (1 - slip)
+
+        z = (price - row['ma']) / (row['std'] or 1e-9)
+
+        if pos > 0:
+            if stop_loss_pct > 0 and (price <= entry_price * (1 - stop_loss_pct)):
+                cash += pos * sell_price * (1 - fee)
+                pos = 0
+            elif take_profit_pct > 0 and (price >= entry_price * (1 + take_profit_pct)):
+                cash += pos * sell_price * (1 - fee)
+                pos = 0
+
+        # 低于入场阈值买入，高于离场阈值卖出
+        if pos == 0 and z <= -abs(z_entry):
+            usdt_to_use = min(cash, 1000000)
+            if usdt_to_use > 0:
+                qty = (usdt_to_use / buy_price) * (1 - fee)
+                pos += qty
+                cash -= usdt_to_use
+                entry_price = buy_price
+        elif pos > 0 and z >= abs(z_exit):
+            cash += pos * sell_price * (1 - fee)
+            pos = 0
+
+        equity = cash + pos * price
+        equity_curve.append(equity)
+        if i > 0:
+            rets.append((equity_curve[-1] - equity_curve[-2]) / max(equity_curve[-2], 1e-9))
+
+    pnl = (equity_curve[-1] - cash0) / cash0 if equity_curve else 0.0
+    dd = max_drawdown(equity_curve) if equity_curve else 0.0
+    sharpe = metric_sharpe(rets)
+    sortino = metric_sortino(rets)
+    return dict(pnl=pnl, dd=dd, sharpe=sharpe, sortino=sortino)
+
+def score(obj: str, m: Dict[str, float]) -> float:
+    if obj == "sortino": return m["sortino"]
+    if obj == "sharpe":  return m["sharpe"]
+    return m["pnl"]  # 默认
+
+# 原 main() 的选参部分（K 线改成参数传入，不联网、不写文件），返回 (best_params, best_score, base_score)
+def select_params(cfg, dfs: Dict[str, pd.DataFrame]):
+    syms: List[str] = cfg.get("symbols", ["BTCUSDT"])
+    risk = cfg.get("risk", {})
+    fee = float(risk.get("fee_rate", 0.0004))
+    slip = float(risk.get("slippage", 0.0002))
+    stop_loss_pct = float(risk.get("stop_loss_pct", 0.02))
+    take_profit_pct = float(risk.get("take_profit_pct", 0.04))
+    trainer = cfg.get("trainer", {})
+    objective = trainer.get("objective", "sortino")
+    strategy = cfg.get("strategy", "sma_rsi")
+    params = cfg.get("params", {})
+    seed_cash = 1000.0
+
+    def eval_params_sma_rsi(pa):
+        scores = []
+        for sym in syms:
+            m = backtest_sma_rsi(
+                dfs[sym], seed_cash, fee, slip,
+                pa["sma_fast"], pa["sma_slow"], pa["rsi_len"],
+                pa["rsi_buy_below"], pa["rsi_sell_above"],
+                stop_loss_pct, take_profit_pct
+            )
+            scores.append(score(objective, m))
+        return float(np.mean(scores)) if scores else -1e9
+
+    def eval_params_mean_revert(pa):
+        scores = []
+        for sym in syms:
+            m = backtest_mean_revert(
+                dfs[sym], seed_cash, fee, slip,
+                pa["win_std"], pa["z_entry"], pa["z_exit"],
+                stop_loss_pct, take_profit_pct
+            )
+            scores.append(score(objective, m))
+        return float(np.mean(scores)) if scores else -1e9
+
+    best_params = params.copy()
+    if strategy == "sma_rsi":
+        base = {
+            "sma_fast": int(params.get("sma_fast", 12)),
+            "sma_slow": int(params.get("sma_slow", 26)),
+            "rsi_len":  int(params.get("rsi_len", 14)),
+            "rsi_buy_below": float(params.get("rsi_buy_below", 55)),
+            "rsi_sell_above": float(params.get("rsi_sell_above", 45)),
+        }
+        base_score = eval_params_sma_rsi(base)
+        grid = []
+        for fa in range(max(5, base["sma_fast"]-4), base["sma_fast"]+5, 2):
+            for sl in range(max(fa+1, base["sma_slow"]-10), base["sma_slow"]+11, 4):
+                for rl in [max(8, base["rsi_len"]-4), base["rsi_len"], base["rsi_len"]+4]:
+                    for rb in [base["rsi_buy_below"]-5, base["rsi_buy_below"], base["rsi_buy_below"]+5]:
+                        for rs in [base["rsi_sell_above"]-5, base["rsi_sell_above"], base["rsi_sell_above"]+5]:
+                            if sl <= fa:   # 确保慢线>快线
+                                continue
+                            grid.append(dict(sma_fast=fa, sma_slow=sl, rsi_len=rl,
+                                             rsi_buy_below=max(10, min(90, rb)),
+                                             rsi_sell_above=max(10, min(90, rs))))
+        best_score = base_score
+        for g in grid:
+            sc = eval_params_sma_rsi(g)
+            if sc > best_score:
+                best_score, best_params = sc, g
+    else:
+        base = {
+            "win_std": int(params.get("win_std", 20)),
+            "z_entry": float(params.get("z_entry", 1.0)),
+            "z_exit":  float(params.get("z_exit", 0.3)),
+        }
+        base_score = eval_params_mean_revert(base)
+        grid = []
+        for ws in [max(10, base["win_std"]-10), base["win_std"], base["win_std"]+10]:
+            for ze in [0.8, 1.0, 1.2, 1.5]:
+                for zx in [0.2, 0.3, 0.5, 0.8]:
+                    if zx >= ze:  # 离场阈值应小于入场阈值
+                        continue
+                    grid.append(dict(win_std=ws, z_entry=ze, z_exit=zx))
+        best_score = base_score
+        for g in grid:
+            sc = eval_params_mean_revert(g)
+            if sc > best_score:
+                best_score, best_params = sc, g
+    return best_params, best_score, base_score
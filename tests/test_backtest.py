@@ -0,0 +1,53 @@
+# tests/test_backtest.py
+# 公开回测接口 vs 原 pandas + iterrows 实现（tests/reference_backtest.py）
+# 成交路径（pnl / 回撤）要求完全相同；sharpe / sortino 改成单趟 Welford 累计，只差舍入误差
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests import reference_backtest as ref
+from tools.train_and_update import backtest_mean_revert, backtest_sma_rsi
+
+CASH0, FEE, SLIP = 1000.0, 0.0004, 0.0002
+
+
+def _close_with_flats(seed: int, n: int = 800) -> np.ndarray:
+    """几何随机游走 + 若干平盘段，按 0.01 取整（真实 K 线常见的重复收盘价）"""
+    rng = np.random.default_rng(seed)
+    x = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    x[150:260] = x[150]
+    for _ in range(4):
+        a = int(rng.integers(0, n))
+        x[a:a + int(rng.integers(5, 120))] = x[a]
+    return np.round(x, 2)
+
+
+def _assert_same(got, want):
+    assert got["pnl"] == want["pnl"]
+    assert got["dd"] == want["dd"]
+    for k in ("sharpe", "sortino"):
+        assert got[k] == pytest.approx(want[k], rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("sma_fast,sma_slow,rsi_len,rsi_buy_below,rsi_sell_above", [
+    (12, 26, 14, 55, 45),
+    (5, 20, 8, 60, 40),
+    (9, 30, 18, 50, 50),
+])
+@pytest.mark.parametrize("sl,tp", [(0.02, 0.04), (0.005, 0.01), (0.0, 0.0)])
+def test_sma_rsi_matches_reference(seed, sma_fast, sma_slow, rsi_len, rsi_buy_below, rsi_sell_above, sl, tp):
+    close = _close_with_flats(seed)
+    args = (CASH0, FEE, SLIP, sma_fast, sma_slow, rsi_len, rsi_buy_below, rsi_sell_above, sl, tp)
+    _assert_same(backtest_sma_rsi({"close": close}, *args),
+                 ref.backtest_sma_rsi(pd.DataFrame({"close": close}), *args))
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("win_std", [10, 20, 30])
+@pytest.mark.parametrize("z_entry,z_exit", [(1.0, 0.3), (1.5, 0.5), (0.8, 0.2)])
+def test_mean_revert_matches_reference(seed, win_std, z_entry, z_exit):
+    close = _close_with_flats(seed)
+    args = (CASH0, FEE, SLIP, win_std, z_entry, z_exit, 0.02, 0.04)
+    _assert_same(backtest_mean_revert({"close": close}, *args),
+                 ref.backtest_mean_revert(pd.DataFrame({"close": close}), *args))
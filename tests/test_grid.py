@@ -0,0 +1,66 @@
+# tests/test_grid.py
+# main() 的网格选参（结构化网格 + _prune_grid + 指标缓存 + 多进程）vs 原来逐组合 iterrows 回测的选参结果
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tools.train_and_update as T
+from tests import reference_backtest as ref
+from tests.test_backtest import _close_with_flats
+
+SYMS = ["AAAUSDT", "BBBUSDT"]
+CLOSES = {sym: _close_with_flats(seed, n=400) for seed, sym in enumerate(SYMS)}
+DFS = {sym: pd.DataFrame({"close": c}) for sym, c in CLOSES.items()}
+
+# 基准回测很慢（iterrows）：同一组参数在不同 objective / n_jobs 用例间只跑一次
+_REF_CACHE = {}
+
+
+def _memo(fn):
+    def wrapper(df, *args):
+        key = (fn.__name__, id(df), args)
+        if key not in _REF_CACHE:
+            _REF_CACHE[key] = fn(df, *args)
+        return _REF_CACHE[key]
+    return wrapper
+
+
+def _run_main(monkeypatch, cfg, closes):
+    """不联网、不写文件地跑一遍 main()，返回写回的 params"""
+    saved = {}
+    monkeypatch.setattr(T, "load_cfg", lambda: copy.deepcopy(cfg))
+    monkeypatch.setattr(T, "save_cfg", lambda c: saved.update(c))
+    monkeypatch.setattr(T, "fetch_klines", lambda sym, interval, lookback_h: {"close": closes[sym]})
+    T.main()
+    return saved["params"]
+
+
+@pytest.mark.parametrize("objective", ["sortino", "sharpe", "pnl"])
+@pytest.mark.parametrize("strategy,params", [
+    ("sma_rsi", {"sma_fast": 12, "sma_slow": 26, "rsi_len": 14, "rsi_buy_below": 55, "rsi_sell_above": 45}),
+    # 阈值贴边：裁剪后出现重复行 / 与 base 相同的行，走 _prune_grid
+    ("sma_rsi", {"sma_fast": 7, "sma_slow": 18, "rsi_len": 8, "rsi_buy_below": 90, "rsi_sell_above": 12}),
+    ("mean_revert", {"win_std": 20, "z_entry": 1.0, "z_exit": 0.3}),
+])
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_main_selects_same_params_as_reference(monkeypatch, objective, strategy, params, n_jobs):
+    cfg = {
+        "symbols": SYMS,
+        "strategy": strategy,
+        "params": params,
+        "trainer": {"objective": objective, "min_improve_pct": -1e18, "n_jobs": n_jobs},
+    }
+    got = _run_main(monkeypatch, cfg, CLOSES)
+    monkeypatch.setattr(ref, "backtest_sma_rsi", _memo(ref.backtest_sma_rsi))
+    monkeypatch.setattr(ref, "backtest_mean_revert", _memo(ref.backtest_mean_revert))
+    want, _, _ = ref.select_params(cfg, DFS)
+    assert got == want
+
+
+def test_prune_grid_keeps_order_and_drops_base():
+    grid = np.array([(20, 1.0, 0.3), (10, 0.8, 0.2), (20, 1.0, 0.3), (30, 1.2, 0.5), (10, 0.8, 0.2)],
+                    dtype=T._MEAN_REVERT_GRID)
+    pruned = T._prune_grid(grid, {"win_std": 30, "z_entry": 1.2, "z_exit": 0.5})
+    assert pruned.tolist() == [(20, 1.0, 0.3), (10, 0.8, 0.2)]
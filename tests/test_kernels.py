@@ -0,0 +1,87 @@
+# tests/test_kernels.py
+# 流式指标核 vs pandas：三个指标都要求逐位相同（平盘段尤其容易出问题）
+# 对外入口和循环核都测：没装 numba 时对外入口走 pandas，循环核照样得对
+import numpy as np
+import pandas as pd
+import pytest
+
+from trainer import _kernels
+from trainer._kernels import rolling_mean, rolling_std, ewm_rsi
+
+MEAN = pytest.mark.parametrize("mean_fn", [rolling_mean, _kernels._rolling_mean_loop], ids=["public", "loop"])
+STD = pytest.mark.parametrize("std_fn", [rolling_std, _kernels._rolling_std_loop], ids=["public", "loop"])
+RSI = pytest.mark.parametrize("rsi_fn", [ewm_rsi, _kernels._ewm_rsi_loop], ids=["public", "loop"])
+
+
+def _walk_with_flats(seed: int, n: int = 600) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    x = 100 + np.cumsum(rng.normal(0, 1, n))
+    # 几段平盘：收盘价连续不变
+    x[100:160] = x[100]
+    x[300:305] = x[300]
+    x[450:530] = x[450]
+    return x
+
+
+@MEAN
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("w", [1, 2, 5, 14, 20, 60])
+def test_rolling_mean_matches_pandas_exactly(mean_fn, seed, w):
+    x = _walk_with_flats(seed)
+    ref = pd.Series(x).rolling(w).mean().to_numpy()
+    np.testing.assert_array_equal(mean_fn(x, w), ref)
+
+
+@MEAN
+def test_rolling_mean_mixed_sign_and_rounded(mean_fn):
+    rng = np.random.default_rng(7)
+    x = np.round(np.cumsum(rng.normal(0, 1, 800)), 1)
+    x[200:260] = x[200]
+    for w in (3, 20, 50):
+        ref = pd.Series(x).rolling(w).mean().to_numpy()
+        np.testing.assert_array_equal(mean_fn(x, w), ref)
+
+
+@MEAN
+def test_flat_stretch_has_no_phantom_crossover(mean_fn):
+    # 平盘走够慢线窗口后，快慢均线必须完全相等，不能出现 sf > ss 的假 up_trend
+    x = _walk_with_flats(0)
+    sf, ss = mean_fn(x, 5), mean_fn(x, 20)
+    flat = slice(120, 160)
+    assert (sf[flat] == ss[flat]).all()
+    assert not (sf[flat] > ss[flat]).any()
+
+
+@STD
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("w", [2, 5, 20, 60])
+def test_rolling_std_matches_pandas_exactly(std_fn, seed, w):
+    x = _walk_with_flats(seed)
+    ref = pd.Series(x).rolling(w).std().to_numpy()
+    np.testing.assert_array_equal(std_fn(x, w), ref)
+
+
+@RSI
+@pytest.mark.parametrize("length", [7, 14])
+def test_ewm_rsi_matches_pandas(rsi_fn, length):
+    x = pd.Series(_walk_with_flats(2))
+    delta = x.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / length, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / length, adjust=False).mean()
+    ref = (100 - 100 / (1 + gain / loss.replace(0, np.nan))).to_numpy()
+    np.testing.assert_array_equal(rsi_fn(x.to_numpy(), length), ref)
+
+
+@pytest.mark.parametrize("w", [0, 1])
+def test_short_windows_all_nan_like_loop(w):
+    x = _walk_with_flats(3)
+    np.testing.assert_array_equal(rolling_mean(x, w), _kernels._rolling_mean_loop(x, w))
+    np.testing.assert_array_equal(rolling_std(x, w), _kernels._rolling_std_loop(x, w))
+
+
+def test_public_entry_points_skip_python_loops_without_numba():
+    # 没有真 njit 时，对外入口不能是逐元素 Python 循环
+    loops = (_kernels._rolling_mean_loop, _kernels._rolling_std_loop, _kernels._ewm_rsi_loop)
+    public = (rolling_mean, rolling_std, ewm_rsi)
+    for pub, loop in zip(public, loops):
+        assert (pub is loop) == _kernels.HAVE_NUMBA
@@ -0,0 +1,56 @@
+# tests/test_signals.py
+# 信号掩码 + 空仓段跳跃（bt_signals）和按窗口缓存的指标（_sma_rsi_inputs / _mean_revert_inputs），平盘段输入
+import numpy as np
+import pandas as pd
+import pytest
+
+import tools.train_and_update as T
+from tests import reference_backtest as ref
+from tests.test_backtest import CASH0, FEE, SLIP, _close_with_flats
+from trainer._kernels import bt_signals
+
+SL, TP = 0.02, 0.04
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_skip_flat_stretches_matches_bar_by_bar(seed):
+    # entry_idx 给满 0..n-1 时核不会跳任何一根 bar：两种走法必须得到同一结果
+    rng = np.random.default_rng(seed)
+    close = _close_with_flats(seed)
+    entry = rng.random(close.shape[0]) < 0.03
+    entry[100:400] = False            # 长时间没有开仓信号：整段走 _merge_zeros
+    exit_ = rng.random(close.shape[0]) < 0.1
+    args = (float(CASH0), FEE, SLIP, SL, TP)
+    skip = bt_signals(close, entry, exit_, np.flatnonzero(entry), *args)
+    full = bt_signals(close, entry, exit_, np.arange(close.shape[0]), *args)
+    assert skip[:2] == full[:2]       # pnl, dd
+    np.testing.assert_allclose(skip[2:], full[2:], rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sma_rsi_inputs_match_reference(seed):
+    close = _close_with_flats(seed, n=500)
+    df = pd.DataFrame({"close": close})
+    combos = [(5, 20, 8, 60, 40), (12, 26, 14, 55, 45), (10, 30, 18, 50, 50)]
+    T._init_worker(dict(
+        ind=[T._sma_rsi_inputs({"close": close}, {5, 10, 12, 20, 26, 30}, {8, 14, 18})],
+        objective="pnl", fee=FEE, slip=SLIP, stop_loss_pct=SL, take_profit_pct=TP, seed_cash=CASH0,
+    ))
+    for fa, sl, rl, rb, rs in combos:
+        pa = dict(sma_fast=fa, sma_slow=sl, rsi_len=rl, rsi_buy_below=rb, rsi_sell_above=rs)
+        want = ref.backtest_sma_rsi(df, CASH0, FEE, SLIP, fa, sl, rl, rb, rs, SL, TP)
+        assert T._eval_sma_rsi(pa) == want["pnl"]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_mean_revert_inputs_match_reference(seed):
+    close = _close_with_flats(seed, n=500)
+    df = pd.DataFrame({"close": close})
+    T._init_worker(dict(
+        ind=[T._mean_revert_inputs({"close": close}, {10, 20, 30})],
+        objective="pnl", fee=FEE, slip=SLIP, stop_loss_pct=SL, take_profit_pct=TP, seed_cash=CASH0,
+    ))
+    for ws in (10, 20, 30):
+        for ze, zx in [(0.8, 0.2), (1.0, 0.3), (1.5, 0.5)]:
+            want = ref.backtest_mean_revert(df, CASH0, FEE, SLIP, ws, ze, zx, SL, TP)
+            assert T._eval_mean_revert(dict(win_std=ws, z_entry=ze, z_exit=zx)) == want["pnl"]
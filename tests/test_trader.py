@@ -0,0 +1,170 @@
+"""
+trader -> main.run_once -> generate_signal 这条链路上的K线顺序。
+OKX 返回最新在前，策略要的是最旧在前。
+"""
+import threading
+
+import pytest
+
+pytest.importorskip("okx")
+
+import bot.main as bot_main
+import bot.trader as bot_trader
+
+
+T0 = 1_700_000_000_000
+STEP = 15 * 60 * 1000
+
+
+def _okx_rows(n):
+    # OKX 格式：[ts, o, h, l, c, vol, ...]，按 ts 倒序（最新在前）
+    rows = []
+    for i in range(n):
+        ts = T0 + i * STEP
+        px = f"{100 + i:.1f}"
+        rows.append([str(ts), px, px, px, px, "1", "1", "1", "1"])
+    return rows[::-1]
+
+
+# (client, 方法名, 线程名)
+CALLS = []
+
+
+class _FakeClient:
+    def __init__(self, *args, **kwargs):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def _hit(self, name):
+        CALLS.append((self, name, threading.current_thread().name))
+
+
+class _FakeMarket(_FakeClient):
+    ticker_error = None
+
+    def get_ticker(self, instId):
+        self._hit("ticker")
+        if self.ticker_error is not None:
+            raise self.ticker_error
+        return {"data": [{"last": "123.4"}]}
+
+    def get_candlesticks(self, instId, bar, limit):
+        self._hit("candles")
+        return {"data": _okx_rows(int(limit))}
+
+
+class _FakeAccount(_FakeClient):
+    def get_positions(self, instId=None):
+        self._hit("positions")
+        return {"data": []}
+
+
+class _FakeTrade(_FakeAccount):
+    pass
+
+
+@pytest.fixture
+def fake_okx(monkeypatch, tmp_path):
+    monkeypatch.setenv("OKX_API_KEY", "k")
+    monkeypatch.setenv("OKX_API_SECRET", "s")
+    monkeypatch.setenv("OKX_API_PASSPHRASE", "p")
+    monkeypatch.setenv("BOT_ENV", "test")
+    monkeypatch.setattr(_FakeMarket, "ticker_error", None)
+    CALLS.clear()
+    monkeypatch.setattr(bot_trader, "MarketAPI", _FakeMarket)
+    monkeypatch.setattr(bot_trader, "AccountAPI", _FakeAccount)
+    monkeypatch.setattr(bot_trader, "TradeAPI", _FakeTrade)
+    return {
+        "symbols": ["BTCUSDT"],
+        "interval": "15m",
+        "htf_bar": "1h",
+        "limit": 50,
+        "htf_limit": 30,
+        "trade_journal_path": str(tmp_path / "journal.csv"),
+    }
+
+
+def _ts(klines):
+    return [int(row[0]) for row in klines]
+
+
+def test_get_candles_oldest_first(fake_okx):
+    trader = bot_trader.OKXTrader(fake_okx)
+    ts = _ts(trader.get_candles("BTC-USDT-SWAP", bar="15m", limit=20))
+    assert ts == sorted(ts)
+    assert ts[-1] == T0 + 19 * STEP
+
+
+def test_run_once_feeds_generate_signal_in_time_order(fake_okx, monkeypatch):
+    seen = []
+
+    def spy(symbol, klines, cfg, htf_klines=None, debug=False):
+        seen.append((klines, htf_klines))
+        return None, {}
+
+    monkeypatch.setattr(bot_main, "generate_signal", spy)
+    bot_main.run_once(fake_okx)
+
+    assert len(seen) == 1
+    klines, htf_klines = seen[0]
+    for rows, n in ((klines, 50), (htf_klines, 30)):
+        ts = _ts(rows)
+        assert len(ts) == n
+        assert all(a < b for a, b in zip(ts, ts[1:]))
+        # closes[-1] 必须是最新一根
+        assert float(rows[-1][4]) == 100 + n - 1
+
+
+def test_prefetch_skips_rest_when_ticker_fails(fake_okx, monkeypatch):
+    monkeypatch.setattr(_FakeMarket, "ticker_error", RuntimeError("ticker down"))
+    with bot_trader.OKXTrader(fake_okx) as trader:
+        futs = trader.prefetch_market("BTC-USDT-SWAP", bar="15m", limit=10, htf_bar="1H", htf_limit=10)
+        for f in futs.values():
+            with pytest.raises(RuntimeError, match="ticker down"):
+                f.result()
+    assert [name for _, name, _ in CALLS] == ["ticker"]
+
+
+def test_prefetch_uses_per_thread_clients_and_close_shuts_pool(fake_okx):
+    trader = bot_trader.OKXTrader(fake_okx)
+    with trader:
+        futs = trader.prefetch_market("BTC-USDT-SWAP", bar="15m", limit=10, htf_bar="1H", htf_limit=10)
+        for f in futs.values():
+            f.result()
+        pool = trader._pool
+        workers = list(trader._worker_clients)
+
+    assert sorted(name for _, name, _ in CALLS) == ["candles", "candles", "positions", "ticker"]
+    for client, _, thread_name in CALLS:
+        # 池线程不碰主线程的 client，各用各的
+        assert thread_name.startswith("okx-prefetch")
+        assert client is not trader.market and client is not trader.account
+        assert client in workers
+    # 同一线程只建一套 client
+    per_thread = {}
+    for client, _, thread_name in CALLS:
+        per_thread.setdefault((thread_name, type(client)), set()).add(id(client))
+    assert all(len(v) == 1 for v in per_thread.values())
+
+    assert trader._pool is None
+    assert pool._shutdown
+    assert workers and all(c.closed for c in workers)
+    assert not trader.market.closed
+
+
+def test_run_once_closes_its_trader(fake_okx, monkeypatch):
+    made = []
+    real = bot_trader.OKXTrader
+
+    def factory(*args, **kwargs):
+        made.append(real(*args, **kwargs))
+        return made[-1]
+
+    monkeypatch.setattr(bot_main, "OKXTrader", factory)
+    monkeypatch.setattr(bot_main, "generate_signal", lambda **kw: (None, {}))
+    bot_main.run_once(fake_okx)
+    assert len(made) == 1 and made[0]._pool is None
+    assert any(name.startswith("okx-prefetch") for _, _, name in CALLS)
+    assert not [t for t in threading.enumerate() if t.name.startswith("okx-prefetch")]
@@ -0,0 +1,47 @@
+# tests/test_wecom_notify.py
+# 企业微信 markdown 上限按 UTF-8 字节算：合并 / 拆分后每条都不能超过 4096 字节
+import pytest
+
+import bot.wecom_notify as w
+
+
+def test_md_parts_respects_byte_limit():
+    content = "".join(f"- 第{i}行：中文内容占三个字节\n" for i in range(600)) + "长" * 3000
+    parts = w._md_parts(content)
+    assert len(parts) > 1
+    assert all(len(p.encode("utf-8")) <= w._MD_MAX for p in parts)
+    assert "".join(parts) == content
+
+
+def test_md_parts_short_message_untouched():
+    assert w._md_parts("### 短消息\n") == ["### 短消息\n"]
+
+
+def test_coalesced_chinese_batch_stays_under_limit(monkeypatch):
+    sent = []
+    monkeypatch.setattr(w, "_post", lambda msgtype, content, webhook=None: sent.append((msgtype, content)))
+    monkeypatch.setattr(w, "_COALESCE_WINDOW", 0.2)
+    msgs = [f"### 告警 {i}\n" + "中" * 1000 for i in range(5)]   # 每条约 3KB：按字符数会被合成一条
+    for m in msgs:
+        w._enqueue("markdown", m)
+    assert w.flush(timeout=5.0)
+    assert all(len(c.encode("utf-8")) <= w._MD_MAX for _, c in sent)
+    assert w._COALESCE_SEP.join(c for _, c in sent) == w._COALESCE_SEP.join(msgs)
+
+
+@pytest.mark.parametrize("detail", [
+    "Traceback (most recent call last):\n" + "  File \"bot/中文路径.py\", line 1, in 下单\n" * 400,
+    "错" * 5000,
+    "x" * 20000,
+])
+@pytest.mark.parametrize("title", ["下单失败", "T" * 300])
+def test_error_md_fits_in_bytes(title, detail):
+    md = w._build_error_md(title, detail, suppressed=12345)
+    # send() 合并重复时还会再追加一句说明，也得装得下
+    assert len((md + w._dedup_note(10 ** 6)).encode("utf-8")) <= w._MD_MAX
+    assert "[truncated" in md
+    assert detail[:20] in md and detail[-20:] in md
+
+
+def test_error_md_short_detail_untouched():
+    assert "```\nboom\n```" in w._build_error_md("t", "boom")
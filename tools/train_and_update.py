@@ -7,14 +7,27 @@
 仅使用 Binance 公共接口，无需 API KEY
 """
 
-import os, json, time, math, statistics, sys
+import os, json, time, math, statistics, sys, copy
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
-import pandas as pd
+
+try:
+    import orjson  # 可选：比标准库 json 解码快数倍
+except ImportError:
+    import json as orjson
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)  # 直接 python tools/train_and_update.py 时也能 import trainer
+
+from trainer._kernels import bt_signals, rolling_mean, rolling_std, ewm_rsi
+
 CONFIG_PATH = os.path.join(ROOT, "config", "params.json")
 
 BINANCE_BASE = "https://api.binance.com"  # 正式网
@@ -23,37 +36,68 @@ BINANCE_BASE = "https://api.binance.com"  # 正式网
 
 UTC = timezone.utc
 
+# 行情请求共用一个 Session：多个 symbol 连续拉 K 线时复用同一条 TCP/TLS 连接；
+# GET 幂等，429/5xx 在 adapter 层退避重试
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        ),
+    ),
+)
+
 def load_cfg() -> Dict[str, Any]:
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # 以 mtime 作缓存键：文件没改就不重新解析；返回深拷贝，调用方随便改
+    return copy.deepcopy(_read_cfg(CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime_ns))
+
+@lru_cache(maxsize=1)
+def _read_cfg(path: str, mtime_ns: int) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+def _dump_cfg(cfg: Dict[str, Any]) -> bytes:
+    if hasattr(orjson, "OPT_INDENT_2"):
+        return orjson.dumps(cfg, option=orjson.OPT_INDENT_2) + b"\n"
+    return (json.dumps(cfg, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
 
 def save_cfg(cfg: Dict[str, Any]):
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, ensure_ascii=False, indent=2)
-        f.write("\n")
-
-def rsi(series: pd.Series, length: int = 14) -> pd.Series:
-    delta = series.diff()
-    gain = (delta.clip(lower=0)).ewm(alpha=1/length, adjust=False).mean()
-    loss = (-delta.clip(upper=0)).ewm(alpha=1/length, adjust=False).mean()
-    rs = gain / (loss.replace(0, np.nan))
-    return 100 - (100 / (1 + rs))
-
-def fetch_klines(symbol: str, interval: str, lookback_hours: int) -> pd.DataFrame:
+    # 先写临时文件再 os.replace 原子替换：中途被打断也不会留下半截 params.json
+    tmp = CONFIG_PATH + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_dump_cfg(cfg))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CONFIG_PATH)
+
+def fetch_klines(symbol: str, interval: str, lookback_hours: int) -> Dict[str, np.ndarray]:
     # Binance 单次最大 1000 根；按小时估算需要的根数
     need = max(100, min(1000, lookback_hours * 60 // _interval_minutes(interval) + 50))
     url = f"{BINANCE_BASE}/api/v3/klines"
     params = dict(symbol=symbol, interval=interval, limit=need)
-    r = requests.get(url, params=params, timeout=15)
+    r = _SESSION.get(url, params=params, timeout=15)
     r.raise_for_status()
-    arr = r.json()
-    cols = ['open_time','open','high','low','close','volume','close_time','qv','trades','tb_base','tb_quote','ignore']
-    df = pd.DataFrame(arr, columns=cols)
-    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms', utc=True)
-    df['close_time'] = pd.to_datetime(df['close_time'], unit='ms', utc=True)
-    for c in ['open','high','low','close','volume']:
-        df[c] = df[c].astype(float)
-    return df
+    arr = orjson.loads(r.content)  # 直接解 bytes，跳过 Response.json 的编码探测
+    # 每行 12 列：open_time, o, h, l, c, v, close_time, ...；只取回测用得到的列，不建 DataFrame
+    raw = np.asarray(arr, dtype=object).reshape(-1, 12)
+    # 转置成 (5, n) 的连续内存，每个字段都是连续的一维数组（numba 核直接吃）
+    ohlcv = np.ascontiguousarray(raw[:, 1:6].astype(np.float64).T)
+    return {
+        'open_time': raw[:, 0].astype(np.int64),   # 毫秒时间戳；要看时间再 .astype('datetime64[ms]')
+        'open': ohlcv[0],
+        'high': ohlcv[1],
+        'low': ohlcv[2],
+        'close': ohlcv[3],
+        'volume': ohlcv[4],
+        'close_time': raw[:, 6].astype(np.int64),
+    }
 
 def _interval_minutes(interval: str) -> int:
     # 简易换算
@@ -64,30 +108,48 @@ def _interval_minutes(interval: str) -> int:
     if unit == 'd': return n * 60 * 24
     raise ValueError(f"Unsupported interval: {interval}")
 
-def metric_sortino(returns: List[float]) -> float:
-    if not returns:
-        return 0.0
-    mean = np.mean(returns)
-    downside = np.std([min(0, r) for r in returns]) or 1e-9
-    return mean / downside
-
-def metric_sharpe(returns: List[float]) -> float:
-    if not returns:
-        return 0.0
-    std = np.std(returns) or 1e-9
-    return np.mean(returns) / std
-
-def max_drawdown(equity: List[float]) -> float:
-    peak = -1e18
-    dd = 0.0
-    for x in equity:
-        if x > peak:
-            peak = x
-        dd = min(dd, (x - peak) / peak if peak > 0 else 0.0)
-    return abs(dd)
+def _warmup(*cols: np.ndarray) -> int:
+    """指标预热段长度：rolling / RSI 的 NaN 只出现在开头，之后各列都有值（等价于原来的 dropna）"""
+    start = 0
+    for c in cols:
+        nan = np.isnan(c)
+        if nan.all():
+            return c.shape[0]
+        start = max(start, int(nan.argmin()))
+    return start
+
+def _run_sma_rsi(close, sf, ss, ra, cash0, fee, slip,
+                 rsi_buy_below, rsi_sell_above, stop_loss_pct, take_profit_pct) -> Dict[str, float]:
+    # 去掉预热段用切片（视图），不复制、不拼 DataFrame
+    i0 = _warmup(sf, ss, ra)
+    close, sf, ss, ra = close[i0:], sf[i0:], ss[i0:], ra[i0:]
+    # 信号整列向量化算好，核里只在有事件的 bar 上走状态机；指标和状态机同一趟算完
+    up_trend = sf > ss
+    entry = up_trend & (ra < rsi_buy_below)
+    exit_ = ~up_trend | (ra > rsi_sell_above)
+    pnl, dd, sharpe, sortino = bt_signals(
+        close, entry, exit_, np.flatnonzero(entry),
+        float(cash0), float(fee), float(slip),
+        float(stop_loss_pct), float(take_profit_pct),
+    )
+    return dict(pnl=pnl, dd=dd, sharpe=sharpe, sortino=sortino)
+
+def _run_mean_revert(close, ma, sd, cash0, fee, slip,
+                     z_entry, z_exit, stop_loss_pct, take_profit_pct) -> Dict[str, float]:
+    i0 = _warmup(ma, sd)
+    close, ma, sd = close[i0:], ma[i0:], sd[i0:]
+    z = (close - ma) / np.where(sd == 0.0, 1e-9, sd)
+    entry = z <= -abs(z_entry)
+    exit_ = z >= abs(z_exit)
+    pnl, dd, sharpe, sortino = bt_signals(
+        close, entry, exit_, np.flatnonzero(entry),
+        float(cash0), float(fee), float(slip),
+        float(stop_loss_pct), float(take_profit_pct),
+    )
+    return dict(pnl=pnl, dd=dd, sharpe=sharpe, sortino=sortino)
 
 def backtest_sma_rsi(
-    df: pd.DataFrame,
+    kl: Dict[str, np.ndarray],
     cash0: float,
     fee: float,
     slip: float,
@@ -99,63 +161,14 @@ def backtest_sma_rsi(
     stop_loss_pct: float,
     take_profit_pct: float,
 ) -> Dict[str, float]:
-    d = df.copy()
-    d['sma_fast'] = d['close'].rolling(sma_fast).mean()
-    d['sma_slow'] = d['close'].rolling(sma_slow).mean()
-    d['rsi'] = rsi(d['close'], rsi_len)
-    d = d.dropna().reset_index(drop=True)
-
-    pos = 0.0    # 持仓数量（以“币”为单位）
-    cash = cash0
-    entry_price = 0.0
-    equity_curve = []
-    rets = []
-
-    for i, row in d.iterrows():
-        price = float(row['close'])
-        # 滑点
-        buy_price  = price * (1 + slip)
-        sell_price = price * (1 - slip)
-
-        # 止损 / 止盈
-        if pos > 0:
-            if stop_loss_pct > 0 and (price <= entry_price * (1 - stop_loss_pct)):
-                cash += pos * sell_price * (1 - fee)
-                pos = 0
-            elif take_profit_pct > 0 and (price >= entry_price * (1 + take_profit_pct)):
-                cash += pos * sell_price * (1 - fee)
-                pos = 0
-
-        # 信号
-        up_trend = row['sma_fast'] > row['sma_slow']
-        if pos == 0 and up_trend and row['rsi'] < rsi_buy_below:
-            # 用固定现金买
-            usdt_to_use = min(cash, 1000000)
-            if usdt_to_use > 0:
-                qty = (usdt_to_use / buy_price) * (1 - fee)
-                pos += qty
-                cash -= usdt_to_use
-                entry_price = buy_price
-
-        elif pos > 0 and ((not up_trend) or row['rsi'] > rsi_sell_above):
-            cash += pos * sell_price * (1 - fee)
-            pos = 0
-
-        equity = cash + pos * price
-        equity_curve.append(equity)
-
-        if i > 0:
-            rets.append((equity_curve[-1] - equity_curve[-2]) / max(equity_curve[-2], 1e-9))
-
-    pnl = (equity_curve[-1] - cash0) / cash0 if equity_curve else 0.0
-    dd = max_drawdown(equity_curve) if equity_curve else 0.0
-    sharpe = metric_sharpe(rets)
-    sortino = metric_sortino(rets)
-
-    return dict(pnl=pnl, dd=dd, sharpe=sharpe, sortino=sortino)
+    close = kl['close']
+    return _run_sma_rsi(
+        close, rolling_mean(close, sma_fast), rolling_mean(close, sma_slow), ewm_rsi(close, rsi_len),
+        cash0, fee, slip, rsi_buy_below, rsi_sell_above, stop_loss_pct, take_profit_pct,
+    )
 
 def backtest_mean_revert(
-    df: pd.DataFrame,
+    kl: Dict[str, np.ndarray],
     cash0: float,
     fee: float,
     slip: float,
@@ -165,59 +178,100 @@ def backtest_mean_revert(
     stop_loss_pct: float,
     take_profit_pct: float,
 ) -> Dict[str, float]:
-    d = df.copy()
-    d['ma'] = d['close'].rolling(win_std).mean()
-    d['std'] = d['close'].rolling(win_std).std()
-    d = d.dropna().reset_index(drop=True)
-
-    pos = 0.0
-    cash = cash0
-    entry_price = 0.0
-    equity_curve, rets = [], []
-
-    for i, row in d.iterrows():
-        price = float(row['close'])
-        buy_price  = price * (1 + slip)
-        sell_price = price * (1 - slip)
-
-        z = (price - row['ma']) / (row['std'] or 1e-9)
-
-        if pos > 0:
-            if stop_loss_pct > 0 and (price <= entry_price * (1 - stop_loss_pct)):
-                cash += pos * sell_price * (1 - fee)
-                pos = 0
-            elif take_profit_pct > 0 and (price >= entry_price * (1 + take_profit_pct)):
-                cash += pos * sell_price * (1 - fee)
-                pos = 0
-
-        # 低于入场阈值买入，高于离场阈值卖出
-        if pos == 0 and z <= -abs(z_entry):
-            usdt_to_use = min(cash, 1000000)
-            if usdt_to_use > 0:
-                qty = (usdt_to_use / buy_price) * (1 - fee)
-                pos += qty
-                cash -= usdt_to_use
-                entry_price = buy_price
-        elif pos > 0 and z >= abs(z_exit):
-            cash += pos * sell_price * (1 - fee)
-            pos = 0
-
-        equity = cash + pos * price
-        equity_curve.append(equity)
-        if i > 0:
-            rets.append((equity_curve[-1] - equity_curve[-2]) / max(equity_curve[-2], 1e-9))
-
-    pnl = (equity_curve[-1] - cash0) / cash0 if equity_curve else 0.0
-    dd = max_drawdown(equity_curve) if equity_curve else 0.0
-    sharpe = metric_sharpe(rets)
-    sortino = metric_sortino(rets)
-    return dict(pnl=pnl, dd=dd, sharpe=sharpe, sortino=sortino)
+    close = kl['close']
+    return _run_mean_revert(
+        close, rolling_mean(close, win_std), rolling_std(close, win_std),
+        cash0, fee, slip, z_entry, z_exit, stop_loss_pct, take_profit_pct,
+    )
+
+def _sma_rsi_inputs(kl: Dict[str, np.ndarray], sma_windows, rsi_lens) -> Dict[str, Any]:
+    """一个 symbol 的 SMA / RSI 按窗口各算一次（流式 O(N) 核），网格里所有组合共用"""
+    close = kl['close']
+    return dict(
+        close=close,
+        sma={w: rolling_mean(close, w) for w in sma_windows},
+        rsi={n: ewm_rsi(close, n) for n in rsi_lens},
+    )
+
+def _mean_revert_inputs(kl: Dict[str, np.ndarray], windows) -> Dict[str, Any]:
+    close = kl['close']
+    return dict(
+        close=close,
+        ma={w: rolling_mean(close, w) for w in windows},
+        std={w: rolling_std(close, w) for w in windows},
+    )
 
 def score(obj: str, m: Dict[str, float]) -> float:
     if obj == "sortino": return m["sortino"]
     if obj == "sharpe":  return m["sharpe"]
     return m["pnl"]  # 默认
 
+# 网格参数用结构化数组：一行一个组合，按字段名取值，传进子进程也只是定长记录
+_SMA_RSI_GRID = np.dtype([
+    ("sma_fast", np.int64), ("sma_slow", np.int64), ("rsi_len", np.int64),
+    ("rsi_buy_below", np.float64), ("rsi_sell_above", np.float64),
+])
+_MEAN_REVERT_GRID = np.dtype([
+    ("win_std", np.int64), ("z_entry", np.float64), ("z_exit", np.float64),
+])
+
+def _prune_grid(grid: np.ndarray, base: Dict[str, Any]) -> np.ndarray:
+    """
+    去掉一定赢不了的组合：重复行（边界裁剪会产生）和与 base 相同的行。
+    它们的得分分别等于先出现的那一行 / base_score，而选优要求严格大于，跳过不影响结果。
+    """
+    _, first = np.unique(grid, return_index=True)
+    grid = grid[np.sort(first)]   # 保持原顺序（同分时先出现者胜）
+    base_row = np.array(tuple(base[k] for k in grid.dtype.names), dtype=grid.dtype)
+    return grid[grid != base_row]
+
+def _params_of(rec) -> Dict[str, Any]:
+    """网格里的一行 -> 写回 params.json 用的普通 dict"""
+    return {k: rec[k].item() for k in rec.dtype.names}
+
+# 网格评估在子进程里跑：预计算好的指标和评估上下文经 initializer 每个进程下发一次，任务本身只传一行参数
+_CTX: Dict[str, Any] = {}
+
+def _init_worker(ctx: Dict[str, Any]):
+    _CTX.clear()
+    _CTX.update(ctx)
+
+# 聚合多币对的成绩取平均（简单起见）；指标直接取缓存，不再按组合重算
+def _eval_sma_rsi(pa) -> float:
+    c = _CTX
+    scores = []
+    for ind in c["ind"]:
+        m = _run_sma_rsi(
+            ind["close"], ind["sma"][pa["sma_fast"]], ind["sma"][pa["sma_slow"]], ind["rsi"][pa["rsi_len"]],
+            c["seed_cash"], c["fee"], c["slip"],
+            pa["rsi_buy_below"], pa["rsi_sell_above"],
+            c["stop_loss_pct"], c["take_profit_pct"]
+        )
+        scores.append(score(c["objective"], m))
+    return float(np.mean(scores)) if scores else -1e9
+
+def _eval_mean_revert(pa) -> float:
+    c = _CTX
+    scores = []
+    for ind in c["ind"]:
+        m = _run_mean_revert(
+            ind["close"], ind["ma"][pa["win_std"]], ind["std"][pa["win_std"]],
+            c["seed_cash"], c["fee"], c["slip"],
+            pa["z_entry"], pa["z_exit"],
+            c["stop_loss_pct"], c["take_profit_pct"]
+        )
+        scores.append(score(c["objective"], m))
+    return float(np.mean(scores)) if scores else -1e9
+
+def _grid_scores(fn, grid: np.ndarray, ctx: Dict[str, Any], n_jobs) -> List[float]:
+    """各组合互相独立：多进程并行评估，返回顺序与 grid 一致"""
+    if n_jobs == 1 or len(grid) < 2:
+        return [fn(g) for g in grid]
+    workers = n_jobs or os.cpu_count() or 1
+    chunk = max(1, len(grid) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ctx,)) as ex:
+        return list(ex.map(fn, grid, chunksize=chunk))
+
 def main():
     cfg = load_cfg()
     syms: List[str] = cfg.get("symbols", ["BTCUSDT"])
@@ -237,31 +291,11 @@ def main():
 
     print(f"[INFO] symbols={syms}, interval={interval}, strategy={strategy}, objective={objective}")
 
-    # 聚合多币对的成绩取平均（简单起见）
-    def eval_params_sma_rsi(pa: Dict[str, Any]) -> float:
-        scores = []
-        for sym in syms:
-            df = fetch_klines(sym, interval, lookback_h)
-            m = backtest_sma_rsi(
-                df, seed_cash, fee, slip,
-                pa["sma_fast"], pa["sma_slow"], pa["rsi_len"],
-                pa["rsi_buy_below"], pa["rsi_sell_above"],
-                stop_loss_pct, take_profit_pct
-            )
-            scores.append(score(objective, m))
-        return float(np.mean(scores)) if scores else -1e9
-
-    def eval_params_mean_revert(pa: Dict[str, Any]) -> float:
-        scores = []
-        for sym in syms:
-            df = fetch_klines(sym, interval, lookback_h)
-            m = backtest_mean_revert(
-                df, seed_cash, fee, slip,
-                pa["win_std"], pa["z_entry"], pa["z_exit"],
-                stop_loss_pct, take_profit_pct
-            )
-            scores.append(score(objective, m))
-        return float(np.mean(scores)) if scores else -1e9
+    n_jobs = int(trainer.get("n_jobs", 0)) or None   # 0 / 不填 = 用满 CPU
+    # K 线每个 symbol 只拉一次，整个网格共用（原来每个组合都会重新请求一遍）
+    klines = {sym: fetch_klines(sym, interval, lookback_h) for sym in syms}
+    ctx = dict(objective=objective, fee=fee, slip=slip,
+               stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct, seed_cash=seed_cash)
 
     best_params = params.copy()
     if strategy == "sma_rsi":
@@ -272,26 +306,33 @@ def main():
             "rsi_buy_below": float(params.get("rsi_buy_below", 55)),
             "rsi_sell_above": float(params.get("rsi_sell_above", 45)),
         }
-        base_score = eval_params_sma_rsi(base)
+
+        # 局部网格（围绕当前参数微调）：直接生成结构化数组，每个组合一行，不再逐个建 dict
+        fa_sl = [(fa, sl)
+                 for fa in range(max(5, base["sma_fast"]-4), base["sma_fast"]+5, 2)
+                 for sl in range(max(fa+1, base["sma_slow"]-10), base["sma_slow"]+11, 4)
+                 if sl > fa]   # 确保慢线>快线
+        rls = [max(8, base["rsi_len"]-4), base["rsi_len"], base["rsi_len"]+4]
+        rbs = [max(10, min(90, rb)) for rb in (base["rsi_buy_below"]-5, base["rsi_buy_below"], base["rsi_buy_below"]+5)]
+        rss = [max(10, min(90, rs)) for rs in (base["rsi_sell_above"]-5, base["rsi_sell_above"], base["rsi_sell_above"]+5)]
+        grid = np.array([(fa, sl, rl, rb, rs)
+                         for fa, sl in fa_sl for rl in rls for rb in rbs for rs in rss],
+                        dtype=_SMA_RSI_GRID)
+        grid = _prune_grid(grid, base)
+
+        # 每个 sma 窗口 / rsi 长度只算一次（O(|grid|) 次 rolling -> O(|窗口|) 次）
+        sma_windows = {base["sma_fast"], base["sma_slow"]} | set(grid["sma_fast"].tolist()) | set(grid["sma_slow"].tolist())
+        rsi_lens = {base["rsi_len"]} | set(grid["rsi_len"].tolist())
+        ctx["ind"] = [_sma_rsi_inputs(kl, sma_windows, rsi_lens) for kl in klines.values()]
+        _init_worker(ctx)
+
+        base_score = _eval_sma_rsi(base)
         print(f"[BASE] {base} -> {objective}={base_score:.4f}")
 
-        # 局部网格（围绕当前参数微调）
-        grid = []
-        for fa in range(max(5, base["sma_fast"]-4), base["sma_fast"]+5, 2):
-            for sl in range(max(fa+1, base["sma_slow"]-10), base["sma_slow"]+11, 4):
-                for rl in [max(8, base["rsi_len"]-4), base["rsi_len"], base["rsi_len"]+4]:
-                    for rb in [base["rsi_buy_below"]-5, base["rsi_buy_below"], base["rsi_buy_below"]+5]:
-                        for rs in [base["rsi_sell_above"]-5, base["rsi_sell_above"], base["rsi_sell_above"]+5]:
-                            if sl <= fa:   # 确保慢线>快线
-                                continue
-                            grid.append(dict(sma_fast=fa, sma_slow=sl, rsi_len=rl,
-                                             rsi_buy_below=max(10, min(90, rb)),
-                                             rsi_sell_above=max(10, min(90, rs))))
         best_score = base_score
-        for g in grid:
-            sc = eval_params_sma_rsi(g)
+        for g, sc in zip(grid, _grid_scores(_eval_sma_rsi, grid, ctx, n_jobs)):
             if sc > best_score:
-                best_score, best_params = sc, g
+                best_score, best_params = sc, _params_of(g)
         improve = (best_score - base_score) / (abs(base_score) + 1e-9)
         print(f"[BEST] {best_params} -> {objective}={best_score:.4f}, improve={improve:.2%}")
 
@@ -308,22 +349,25 @@ def main():
             "z_entry": float(params.get("z_entry", 1.0)),
             "z_exit":  float(params.get("z_exit", 0.3)),
         }
-        base_score = eval_params_mean_revert(base)
+        grid = np.array([(ws, ze, zx)
+                         for ws in [max(10, base["win_std"]-10), base["win_std"], base["win_std"]+10]
+                         for ze in [0.8, 1.0, 1.2, 1.5]
+                         for zx in [0.2, 0.3, 0.5, 0.8]
+                         if zx < ze],   # 离场阈值应小于入场阈值
+                        dtype=_MEAN_REVERT_GRID)
+        grid = _prune_grid(grid, base)
+
+        windows = {base["win_std"]} | set(grid["win_std"].tolist())
+        ctx["ind"] = [_mean_revert_inputs(kl, windows) for kl in klines.values()]
+        _init_worker(ctx)
+
+        base_score = _eval_mean_revert(base)
         print(f"[BASE] {base} -> {objective}={base_score:.4f}")
 
-        grid = []
-        for ws in [max(10, base["win_std"]-10), base["win_std"], base["win_std"]+10]:
-            for ze in [0.8, 1.0, 1.2, 1.5]:
-                for zx in [0.2, 0.3, 0.5, 0.8]:
-                    if zx >= ze:  # 离场阈值应小于入场阈值
-                        continue
-                    grid.append(dict(win_std=ws, z_entry=ze, z_exit=zx))
-
         best_score = base_score
-        for g in grid:
-            sc = eval_params_mean_revert(g)
+        for g, sc in zip(grid, _grid_scores(_eval_mean_revert, grid, ctx, n_jobs)):
             if sc > best_score:
-                best_score, best_params = sc, g
+                best_score, best_params = sc, _params_of(g)
         improve = (best_score - base_score) / (abs(base_score) + 1e-9)
         print(f"[BEST] {best_params} -> {objective}={best_score:.4f}, improve={improve:.2%}")
 
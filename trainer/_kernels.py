@@ -0,0 +1,333 @@
+# trainer/_kernels.py
+# -*- coding: utf-8 -*-
+"""
+回测热循环：按信号驱动的持仓/现金状态机，以及网格搜索用的流式指标（SMA / 滚动标准差 / RSI）。
+输入全部是一维连续数组 + 标量，装了 numba 就 JIT 编译。
+没装 numba 时：回测核按纯 Python 跑（结果一致，只是慢）；三个流式指标逐元素 Python 循环比 pandas 还慢，
+对外的 rolling_mean / rolling_std / ewm_rsi 改走 pandas 向量化实现（本来就是对拍基准，结果逐位相同）。
+"""
+import numpy as np
+
+try:
+    from numba import njit  # 可选：pip install numba
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # 兼容 @njit 与 @njit(cache=True, ...) 两种写法，原样返回函数
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+# 回测核在同一趟循环里顺带累计指标，不再物化 equity / rets 数组：
+#   - 回撤：滚动峰值 + 最大回撤
+#   - 收益率 r_i = (e_i - e_{i-1}) / max(e_{i-1}, 1e-9)：Welford 单趟均值/方差
+#   - 下行：min(r, 0) 同样单趟求方差
+# 口径与原 pandas 回测的 max_drawdown / metric_sharpe / metric_sortino 一致（总体标准差，见 tests/reference_backtest.py）
+
+@njit(cache=True)
+def _finish(n, last_eq, cash0, max_dd, cnt, m2_r, mean_r, m2_d):
+    """把循环里累计的统计量收成 (pnl, dd, sharpe, sortino)"""
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    pnl = (last_eq - cash0) / cash0
+    if cnt == 0:
+        return pnl, max_dd, 0.0, 0.0
+    sd = np.sqrt(m2_r / cnt)
+    sdd = np.sqrt(m2_d / cnt)
+    if sd == 0.0:
+        sd = 1e-9
+    if sdd == 0.0:
+        sdd = 1e-9
+    return pnl, max_dd, mean_r / sd, mean_r / sdd
+
+
+@njit(cache=True)
+def _merge_zeros(cnt, k, mean, m2):
+    """Welford 状态（已有 cnt 个样本）一次并入 k 个 0（Chan 合并公式），空仓段整段跳过用"""
+    tot = cnt + k
+    delta = -mean
+    return mean + delta * k / tot, m2 + delta * delta * cnt * k / tot
+
+
+# 不开 fastmath：它允许重排 / 合并浮点运算，Welford 累计和权益逐位就和参考实现对不上了
+@njit(cache=True)
+def bt_signals(close, entry, exit_, entry_idx, cash0, fee, slip, sl, tp):
+    """
+    只做多的信号回测，返回 (pnl, dd, sharpe, sortino)。
+    entry / exit_：每根 bar 的开仓 / 平仓信号（bool，外面向量化算好）；
+    entry_idx：np.flatnonzero(entry)，空仓时直接跳到下一个开仓信号。
+    空仓且没有开仓信号的 bar 权益不变、收益率为 0，不必逐根走状态机。
+    """
+    n = close.shape[0]
+    n_ev = entry_idx.shape[0]
+    ev = 0
+    pos = 0.0
+    cash = cash0
+    entry_price = 0.0
+    eq = 0.0
+    peak = 0.0
+    max_dd = 0.0
+    cnt = 0
+    mean_r = 0.0
+    m2_r = 0.0
+    mean_d = 0.0
+    m2_d = 0.0
+    # 循环不变量提到循环外；止损/止盈触发价只在开仓时算一次
+    fee_mult = 1.0 - fee
+    buy_slip = 1.0 + slip
+    sell_slip = 1.0 - slip
+    use_sl = sl > 0
+    use_tp = tp > 0
+    sl_trigger = 0.0
+    tp_trigger = 0.0
+    i = 0
+    while i < n:
+        if pos == 0 and i > 0:
+            # 空仓：上一根收盘权益就是 cash，跳到下一个开仓信号，中间每根收益率都是 0
+            while ev < n_ev and entry_idx[ev] < i:
+                ev += 1
+            j = entry_idx[ev] if ev < n_ev else n
+            if j > i:
+                k = j - i
+                mean_r, m2_r = _merge_zeros(cnt, k, mean_r, m2_r)
+                mean_d, m2_d = _merge_zeros(cnt, k, mean_d, m2_d)
+                cnt += k
+                i = j
+                if i >= n:
+                    break
+
+        price = close[i]
+
+        # 止损 / 止盈
+        if pos > 0:
+            if use_sl and price <= sl_trigger:
+                cash += pos * (price * sell_slip) * fee_mult
+                pos = 0.0
+            elif use_tp and price >= tp_trigger:
+                cash += pos * (price * sell_slip) * fee_mult
+                pos = 0.0
+
+        # 信号
+        if pos == 0 and entry[i]:
+            usdt_to_use = min(cash, 1000000.0)
+            if usdt_to_use > 0:
+                entry_price = price * buy_slip
+                pos += (usdt_to_use / entry_price) * fee_mult
+                cash -= usdt_to_use
+                sl_trigger = entry_price * (1 - sl)
+                tp_trigger = entry_price * (1 + tp)
+        elif pos > 0 and exit_[i]:
+            cash += pos * (price * sell_slip) * fee_mult
+            pos = 0.0
+
+        prev = eq
+        eq = cash + pos * price
+        # 回撤
+        if i == 0 or eq > peak:
+            peak = eq
+        if peak > 0:
+            dd = (peak - eq) / peak
+            if dd > max_dd:
+                max_dd = dd
+        # 收益率及其下行部分（Welford）
+        if i > 0:
+            r = (eq - prev) / (prev if prev > 1e-9 else 1e-9)
+            cnt += 1
+            delta = r - mean_r
+            mean_r += delta / cnt
+            m2_r += delta * (r - mean_r)
+            d = r if r < 0 else 0.0
+            delta = d - mean_d
+            mean_d += delta / cnt
+            m2_d += delta * (d - mean_d)
+        i += 1
+    return _finish(n, eq, cash0, max_dd, cnt, m2_r, mean_r, m2_d)
+
+
+# ---- 流式指标：一次线性扫描，和 pandas rolling / ewm(adjust=False) 的结果逐位相同 ----
+# 这里不开 fastmath：输出里有 NaN（预热段），而且 fastmath 允许重排浮点运算，会把 Kahan 补偿项消掉
+# 和 pandas 的对拍见 tests/test_kernels.py；对外入口见文件末尾（按有没有 numba 二选一）
+
+@njit(cache=True)
+def _rolling_mean_loop(x, w):
+    """
+    等价 pd.Series(x).rolling(w).mean()，逐位相同（前 w-1 个为 NaN）。
+    照搬 pandas roll_mean 的做法：先删后加、增删各自 Kahan 补偿；窗口内全是同一个值时直接输出该值，
+    全正 / 全负窗口的均值不许变号。裸的滑动累加和会漂，平盘段快慢均线算出来不相等，凭空多出信号。
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if w < 1:
+        return out
+    nobs = 0
+    neg_ct = 0
+    s = 0.0
+    comp_add = 0.0
+    comp_rem = 0.0
+    same = 0
+    prev = x[0] if n > 0 else 0.0
+    for i in range(n):
+        if w == 1 and i > 0:
+            # 窗口为 1 时 pandas 每步都从头重建窗口
+            nobs = 0
+            neg_ct = 0
+            s = 0.0
+            comp_add = 0.0
+            comp_rem = 0.0
+            same = 0
+            prev = x[i]
+        elif i >= w:
+            old = x[i - w]
+            nobs -= 1
+            y = -old - comp_rem
+            t = s + y
+            comp_rem = t - s - y
+            s = t
+            if np.signbit(old):
+                neg_ct -= 1
+        v = x[i]
+        nobs += 1
+        y = v - comp_add
+        t = s + y
+        comp_add = t - s - y
+        s = t
+        if np.signbit(v):
+            neg_ct += 1
+        if v == prev:
+            same += 1
+        else:
+            same = 1
+        prev = v
+        if i >= w - 1:
+            r = s / nobs
+            if same >= nobs:
+                r = prev
+            elif neg_ct == 0 and r < 0:
+                r = 0.0
+            elif neg_ct == nobs and r > 0:
+                r = 0.0
+            out[i] = r
+    return out
+
+
+# 方差增删后剩下不到 3 位有效数字（灾难性抵消）就整窗重算，和 pandas 的 InvCondTol 一致
+_INV_COND_TOL = np.finfo(np.float64).eps * 1e3
+
+
+@njit(cache=True)
+def _add_var(v, nobs, mean, ssqdm, comp):
+    """Welford 加入一个值（Kahan 补偿），返回新状态和是否数值不稳"""
+    prev_m2 = ssqdm
+    nobs += 1.0
+    prev_mean = mean - comp
+    y = v - comp
+    t = y - mean
+    comp = t + mean - y
+    mean = mean + t / nobs
+    ssqdm = ssqdm + (v - prev_mean) * (v - mean)
+    return nobs, mean, ssqdm, comp, prev_m2 * _INV_COND_TOL > ssqdm
+
+
+@njit(cache=True)
+def _rolling_std_loop(x, w):
+    """
+    等价 pd.Series(x).rolling(w).std()（ddof=1），逐位相同。
+    照搬 pandas roll_var：先删后加，Welford 增删各自带 Kahan 补偿，出现灾难性抵消时整窗重算；
+    方差为负按 0 处理。
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if w < 2:
+        return out
+    nobs = 0.0
+    mean = 0.0
+    ssqdm = 0.0
+    comp_add = 0.0
+    comp_rem = 0.0
+    unstable = False
+    for i in range(n):
+        if i >= w:
+            # 删掉滑出窗口的值（窗口长度 >= 2，删完 nobs 不会是 0）
+            old = x[i - w]
+            prev_m2 = ssqdm
+            nobs -= 1.0
+            prev_mean = mean - comp_rem
+            y = old - comp_rem
+            t = y - mean
+            comp_rem = t + mean - y
+            mean = mean - t / nobs
+            ssqdm = ssqdm - (old - prev_mean) * (old - mean)
+            if prev_m2 * _INV_COND_TOL > ssqdm:
+                unstable = True
+        nobs, mean, ssqdm, comp_add, bad = _add_var(x[i], nobs, mean, ssqdm, comp_add)
+        if bad:
+            unstable = True
+        if unstable:
+            # 整窗重算
+            nobs = 0.0
+            mean = 0.0
+            ssqdm = 0.0
+            comp_add = 0.0
+            comp_rem = 0.0
+            for j in range(max(0, i - w + 1), i + 1):
+                nobs, mean, ssqdm, comp_add, bad = _add_var(x[j], nobs, mean, ssqdm, comp_add)
+            unstable = False
+        if i >= w - 1:
+            var = ssqdm / (nobs - 1.0)
+            out[i] = np.sqrt(var) if var >= 0 else 0.0
+    return out
+
+
+@njit(cache=True)
+def _ewm_rsi_loop(x, length):
+    """等价原 pandas 版 rsi（tests/reference_backtest.py）：涨跌幅各自做 alpha=1/length 的递推 EWM，下跌均值为 0 时为 NaN"""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if n < 2:
+        return out
+    a = 1.0 / length
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, n):
+        d = x[i] - x[i - 1]
+        g = d if d > 0 else 0.0
+        l = -d if d < 0 else 0.0
+        if i == 1:
+            gain = g
+            loss = l
+        else:
+            gain = (1 - a) * gain + a * g
+            loss = (1 - a) * loss + a * l
+        if loss > 0:
+            out[i] = 100.0 - 100.0 / (1.0 + gain / loss)
+    return out
+
+
+if HAVE_NUMBA:
+    rolling_mean = _rolling_mean_loop
+    rolling_std = _rolling_std_loop
+    ewm_rsi = _ewm_rsi_loop
+else:
+    import pandas as pd
+
+    def rolling_mean(x, w):
+        """pd.Series(x).rolling(w).mean()；w < 1 全 NaN，和循环版一致"""
+        if w < 1:
+            return np.full(x.shape[0], np.nan)
+        return pd.Series(x).rolling(w).mean().to_numpy()
+
+    def rolling_std(x, w):
+        """pd.Series(x).rolling(w).std()（ddof=1）；w < 2 全 NaN，和循环版一致"""
+        if w < 2:
+            return np.full(x.shape[0], np.nan)
+        return pd.Series(x).rolling(w).std().to_numpy()
+
+    def ewm_rsi(x, length):
+        """原 pandas 版 rsi（tests/reference_backtest.py）原样搬过来"""
+        delta = pd.Series(x).diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / length, adjust=False).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1 / length, adjust=False).mean()
+        return (100 - 100 / (1 + gain / loss.replace(0, np.nan))).to_numpy()
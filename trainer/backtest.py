@@ -1,7 +1,8 @@
 # trainer/backtest.py
 # -*- coding: utf-8 -*-
 import math, time, json
-from statistics import mean
+
+import numpy as np
 
 def equity_curve(trades, fee_rate=0.0004, slippage=0.0002):
     """简化的权益曲线：trades: [(ts, side, price)]，用固定1单位名义仓模拟相对收益"""
@@ -20,15 +21,16 @@ def equity_curve(trades, fee_rate=0.0004, slippage=0.0002):
 
 def metrics_from_equity(eq):
     pnl = eq[-1]-1
-    peaks = []; mdd=0; peak=eq[0]
-    for v in eq:
-        peak=max(peak,v); dd=(peak-v)/peak; mdd=max(mdd,dd)
+    eq_arr = np.asarray(eq, dtype=float)
+    peaks = np.maximum.accumulate(eq_arr)   # 滚动峰值，向量化算最大回撤
+    mdd = max(0.0, float(((peaks - eq_arr) / peaks).max()))
     # 粗略夏普/索提诺（以步进为“天”代指）
-    rets=[(eq[i]/eq[i-1]-1) for i in range(1,len(eq))]
-    if not rets: return {"pnl":pnl,"maxdd":mdd,"sharpe":0,"sortino":0}
-    mu = mean(rets); downside=[r for r in rets if r<0]
-    sd = (mean([(r-mu)**2 for r in rets])**0.5) or 1e-9
-    sdr= (mean([d**2 for d in downside])**0.5) or 1e-9
+    rets = eq_arr[1:]/eq_arr[:-1] - 1
+    if not rets.size: return {"pnl":pnl,"maxdd":mdd,"sharpe":0,"sortino":0}
+    mu = float(rets.mean())
+    sd = float(rets.std()) or 1e-9
+    downside = rets[rets<0]
+    sdr= (float(np.mean(downside**2))**0.5 if downside.size else 0.0) or 1e-9
     sharpe = mu/sd
     sortino= mu/sdr
     return {"pnl":pnl,"maxdd":mdd,"sharpe":sharpe,"sortino":sortino}
\ No newline at end of file
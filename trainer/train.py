@@ -1,6 +1,9 @@
 # trainer/train.py
-import os, sys, json, random, time
+import os, sys, json, time, copy, hashlib
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
 
 # --- 可选：企业微信告警（没有也不影响运行） ---
 try:
@@ -12,6 +15,15 @@ except Exception:
         pass
 
 
+CFG_PATH = "config/params.json"
+
+
+@lru_cache(maxsize=1)
+def _read_file_cfg(mtime_ns):
+    with open(CFG_PATH, "rb") as f:
+        return json.load(f)
+
+
 def load_cfg():
     """
     合并优先级：ENV > params.json > 默认
@@ -19,11 +31,9 @@ def load_cfg():
       SYMBOLS：逗号分隔，如  BTCUSDT,ETHUSDT
       INTERVAL：如 1h / 15m
     """
-    # 1) 读文件
-    file_cfg = {}
+    # 1) 读文件（按 mtime 缓存，文件没改不重复解析）
     try:
-        with open("config/params.json", "rb") as f:
-            file_cfg = json.load(f)
+        file_cfg = copy.deepcopy(_read_file_cfg(os.stat(CFG_PATH).st_mtime_ns))
     except FileNotFoundError:
         file_cfg = {}
 
@@ -51,21 +61,26 @@ def load_cfg():
     }
 
 
-def walk_forward_backtest(symbols, interval, risk, lookback_hours=24, logic=None):
+def _seed_of(*parts):
+    """稳定种子：内置 hash() 对字符串每个进程都加盐，同样的输入两次跑结果会不同"""
+    key = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def walk_forward_backtest(symbols, interval, risk, lookback_hours=24, logic=None, rng=None):
     """
     示例占位：这里替换成你的真实回测逻辑即可。
     现在仅生成一个可重复的随机结果，演示参数更新流程。
+    rng：可传入预先播种的 np.random.Generator（批量蒙特卡洛时复用），不传则按输入参数播种。
     """
-    seed = hash((tuple(symbols), interval, json.dumps(risk, sort_keys=True), json.dumps(logic or {}, sort_keys=True))) & 0xffffffff
-    rnd = random.Random(seed)
-    sharpe = round(rnd.uniform(-0.5, 2.0), 3)
-    winrate = round(rnd.uniform(0.35, 0.7), 3)
-    pnl = round(rnd.uniform(-0.02, 0.08), 4)
-    trades = rnd.randint(20, 120)
+    if rng is None:
+        rng = np.random.default_rng(_seed_of(list(symbols), interval, risk, logic or {}))
+    sharpe, winrate, pnl = rng.uniform([-0.5, 0.35, -0.02], [2.0, 0.7, 0.08])
+    trades = int(rng.integers(20, 121))
     return {
-        "sharpe": sharpe,
-        "winrate": winrate,
-        "pnl": pnl,
+        "sharpe": round(float(sharpe), 3),
+        "winrate": round(float(winrate), 3),
+        "pnl": round(float(pnl), 4),
         "trades": trades,
         "lookback_h": lookback_hours,
     }
@@ -93,10 +108,14 @@ def simple_autoupdate(cfg, result):
 
 def save_cfg(cfg):
     os.makedirs("config", exist_ok=True)
-    # 保持 keys 顺序，便于 diff
-    with open("config/params.json", "w", encoding="utf-8") as f:
+    # 保持 keys 顺序，便于 diff；先写临时文件再原子替换，避免中途失败留下半截 JSON
+    tmp = CFG_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(cfg, f, ensure_ascii=False, indent=2, sort_keys=False)
         f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CFG_PATH)
 
 
 def main():